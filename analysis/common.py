@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for result analysis and plotting
+"""
+
+import functools
+import json
+import os
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, Tuple
+
+import ijson
+import numpy as np
+
+# Files smaller than this are parsed with json.load; larger ones are streamed
+STREAM_THRESHOLD_BYTES = 4 * 1024 * 1024
+
+# iperf3 reports decimal bits per second
+BPS_TO_MBPS = 1e-6
+
+# Per-flow fields consumed by the analysis
+FLOW_KEYS = ('bits_per_second', 'retransmits')
+
+
+def _load_json(path: str) -> dict:
+    """Load a whole JSON document (only used for small files)"""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _is_small(path: str) -> bool:
+    """Check whether a file is small enough to parse in one go"""
+    return os.path.getsize(path) < STREAM_THRESHOLD_BYTES
+
+
+def _stream_items(path: str, prefix: str) -> Iterator[dict]:
+    """Yield the elements of the top-level array ``prefix``"""
+    if _is_small(path):
+        yield from _load_json(path).get(prefix, [])
+        return
+
+    with open(path, 'rb') as f:
+        yield from ijson.items(f, prefix + '.item', use_float=True)
+
+
+def _stream_flows(path: str, keys: Tuple[str, ...] = FLOW_KEYS) -> Iterator[dict]:
+    """
+    Yield per-flow dicts from a results file, keeping only ``keys``
+
+    Args:
+        path: Path to results JSON file
+        keys: Flow fields to keep
+
+    Yields:
+        Dictionary per flow containing the requested keys (if present)
+    """
+    for flow in _stream_items(path, 'flows'):
+        yield {k: flow[k] for k in keys if k in flow}
+
+
+def _stream_bursts(path: str) -> Iterator[dict]:
+    """Yield per-burst dicts from a microburst results file"""
+    yield from _stream_items(path, 'bursts')
+
+
+def _load_scalar_metrics(path: str, prefix: str = 'metrics') -> Dict:
+    """
+    Load the key/value pairs of a top-level object without parsing the rest
+
+    Args:
+        path: Path to results JSON file
+        prefix: Name of the top-level object (default 'metrics')
+
+    Returns:
+        Dictionary of metric names to values
+    """
+    if _is_small(path):
+        return _load_json(path).get(prefix, {})
+
+    with open(path, 'rb') as f:
+        return dict(ijson.kvitems(f, prefix, use_float=True))
+
+
+def _flows_to_arrays(flows: Iterable[dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Extract per-flow throughput and retransmits in a single pass
+
+    Args:
+        flows: Iterable of iperf3 flow result dictionaries
+
+    Returns:
+        Tuple of (throughput in Mbps, retransmits) as float64 arrays
+    """
+    tput_buf = array('d')
+    retrans_buf = array('d')
+    for f in flows:
+        if 'bits_per_second' in f:
+            tput_buf.append(f['bits_per_second'])
+        retrans_buf.append(f.get('retransmits', 0))
+
+    throughput = np.frombuffer(tput_buf, dtype=np.float64)
+    np.multiply(throughput, BPS_TO_MBPS, out=throughput)
+    retrans = np.frombuffer(retrans_buf, dtype=np.float64)
+
+    return throughput, retrans
+
+
+def percentiles(x: np.ndarray, pcts) -> np.ndarray:
+    """
+    Linearly interpolated percentiles, shared by the plots and reports
+
+    Args:
+        x: 1-D data array
+        pcts: Percentiles to extract (0-100)
+
+    Returns:
+        Array of percentile values (NaN for empty input)
+    """
+    if x.size == 0:
+        return np.full(len(pcts), np.nan)
+    return np.percentile(x, pcts)
+
+
+def jains_fairness_index(arr: np.ndarray) -> float:
+    """
+    Calculate Jain's Fairness Index
+
+    Args:
+        arr: Array of measurements (e.g., throughputs)
+
+    Returns:
+        Fairness index (0 to 1)
+    """
+    n = arr.size
+    if n == 0:
+        return 0.0
+
+    sum_x = arr.sum()
+    sum_x_sq = np.dot(arr, arr)
+
+    return float((sum_x ** 2) / (n * sum_x_sq))
+
+
+@dataclass(frozen=True)
+class IncastSummary:
+    """Per-flow vectors and summary statistics for one incast results file"""
+
+    # Declared by hand (rather than slots=True) to keep Python 3.8 support
+    __slots__ = ('throughput', 'retrans', 'mean_tput', 'std_tput',
+                 'min_tput', 'max_tput', 'total_retrans', 'jfi')
+
+    throughput: np.ndarray  # sorted ascending, Mbps, read-only
+    retrans: np.ndarray     # per-flow retransmits, read-only
+    mean_tput: float
+    std_tput: float
+    min_tput: float
+    max_tput: float
+    total_retrans: int
+    jfi: float
+
+    @classmethod
+    def from_file(cls, path: str) -> 'IncastSummary':
+        """
+        Stream an incast results file once and compute all summary stats
+
+        Args:
+            path: Path to incast results JSON file
+
+        Returns:
+            IncastSummary for the file
+        """
+        throughput, retrans = _flows_to_arrays(_stream_flows(path))
+        throughput.sort()
+        throughput.flags.writeable = False
+        retrans.flags.writeable = False
+
+        if throughput.size:
+            mean_tput = float(throughput.mean())
+            std_tput = float(throughput.std())
+            min_tput = float(throughput[0])
+            max_tput = float(throughput[-1])
+        else:
+            mean_tput = std_tput = min_tput = max_tput = float('nan')
+
+        return cls(
+            throughput=throughput,
+            retrans=retrans,
+            mean_tput=mean_tput,
+            std_tput=std_tput,
+            min_tput=min_tput,
+            max_tput=max_tput,
+            total_retrans=int(retrans.sum()),
+            jfi=jains_fairness_index(throughput)
+        )
+
+
+@functools.lru_cache(maxsize=16)
+def load_incast_summary(path: str) -> IncastSummary:
+    """
+    Build (or reuse) the IncastSummary for a results file
+
+    Summaries are immutable, so each file is parsed at most once per
+    process no matter how many plots or reports consume it.
+
+    Args:
+        path: Path to incast results JSON file
+
+    Returns:
+        IncastSummary for the file
+    """
+    return IncastSummary.from_file(os.path.abspath(path))
+
+
+class ResultsDirReader:
+    """Base for tools that read result files out of ``self.results_dir``"""
+
+    results_dir: str
+
+    def _path(self, filename: str) -> str:
+        """Resolve a results filename"""
+        return os.path.join(self.results_dir, filename)
+
+    def load_summary(self, filename: str) -> IncastSummary:
+        """Build (or reuse) the IncastSummary for an incast results file"""
+        return load_incast_summary(self._path(filename))
@@ -3,123 +3,189 @@
 Plot experimental results - Generate visualizations for analysis
 """
 
-import json
 import os
 import argparse
+import gc
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from datetime import datetime
-from typing import List, Dict
+from typing import TYPE_CHECKING
+from common import (IncastSummary, ResultsDirReader, percentiles,
+                    _stream_bursts, _load_scalar_metrics)
 
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
 
-class ResultPlotter:
+
+# Output resolution and PNG encoder settings for saved plots
+SAVE_DPI = 150
+PNG_SAVE_KWARGS = {'optimize': True, 'compress_level': 6}
+
+# Tail percentiles shown in the latency comparison
+LATENCY_PERCENTILES = [50, 90, 95, 99, 99.9]
+
+_STYLE_DONE = False
+
+
+# Text block for the incast summary panel, filled from precomputed scalars
+_SUMMARY_TEMPLATE = """
+SUMMARY METRICS:
+
+ECMP:
+• Avg Throughput: {e_mean:.2f} Mbps
+• Min/Max: {e_min:.2f} / {e_max:.2f} Mbps
+• Std Dev: {e_std:.2f}
+• Total Retransmits: {e_rt}
+
+HULA:
+• Avg Throughput: {h_mean:.2f} Mbps
+• Min/Max: {h_min:.2f} / {h_max:.2f} Mbps
+• Std Dev: {h_std:.2f}
+• Total Retransmits: {h_rt}
+
+IMPROVEMENT:
+• Throughput: {improvement:.1f}%
+• Retransmits: {retrans_reduction:.1f}% reduction
+"""
+
+
+def _configure_style():
+    """Apply the seaborn theme and palette once per process"""
+    global _STYLE_DONE
+    if _STYLE_DONE:
+        return
+    import seaborn as sns
+    sns.set_style("whitegrid")
+    sns.set_palette("husl")
+    _STYLE_DONE = True
+
+
+def _new_figure(nrows: int, ncols: int, figsize):
+    """Create a standalone (non-pyplot) figure with a grid of axes"""
+    # No pyplot and no backend selection: figures are rendered by
+    # attaching FigureCanvasAgg directly in _save_figure
+    from matplotlib.figure import Figure
+    
+    fig = Figure(figsize=figsize, layout="constrained")
+    axes = fig.subplots(nrows, ncols)
+    return fig, axes
+
+
+def _cdf_and_percentiles(x: np.ndarray, pcts=(), presorted: bool = False):
+    """
+    Sort once and derive the empirical CDF and percentiles from the result
+    
+    Percentiles are interpolated by common.percentiles, matching the
+    values printed by the statistical analysis.
+    
+    Args:
+        x: 1-D data array
+        pcts: Percentiles to extract (0-100), none by default
+        presorted: Skip the sort if x is already ascending
+    
+    Returns:
+        Tuple of (sorted x, float32 CDF values, percentile values)
+    """
+    xs = x if presorted else np.sort(x)
+    n = xs.size
+    if n == 0:
+        return xs, np.empty(0, dtype=np.float32), np.full(len(pcts), np.nan)
+    
+    cdf = np.linspace(1.0 / n, 1.0, n, dtype=np.float32)
+    return xs, cdf, percentiles(xs, pcts)
+
+
+def _save_figure(fig: 'Figure', output_file: str):
+    """Render a figure to file with the Agg canvas"""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    
+    FigureCanvasAgg(fig).print_figure(output_file, dpi=SAVE_DPI, bbox_inches='tight',
+                                      pil_kwargs=PNG_SAVE_KWARGS)
+    print(f"✓ Saved plot: {output_file}")
+
+
+def _release_figure(fig: 'Figure'):
+    """Drop a figure's artist tree and collect it immediately"""
+    fig.clear()
+    gc.collect()
+
+
+class ResultPlotter(ResultsDirReader):
     """Generate plots from experimental results"""
     
     def __init__(self, results_dir='../results', output_dir='../results/plots'):
         self.results_dir = results_dir
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
-        
-        # Set style
-        sns.set_style("whitegrid")
-        sns.set_palette("husl")
-    
-    def load_results(self, filename: str) -> dict:
-        """Load results from JSON file"""
-        filepath = os.path.join(self.results_dir, filename)
-        with open(filepath, 'r') as f:
-            return json.load(f)
     
-    def plot_incast_comparison(self, ecmp_file: str, hula_file: str):
+    def plot_incast_comparison(self, ecmp: IncastSummary, hula: IncastSummary):
         """
         Compare ECMP vs HULA for incast scenario
         
         Args:
-            ecmp_file: ECMP results file
-            hula_file: HULA results file
+            ecmp: ECMP incast summary
+            hula: HULA incast summary
         """
-        ecmp_data = self.load_results(ecmp_file)
-        hula_data = self.load_results(hula_file)
-        
-        fig, axes = plt.subplots(2, 2, figsize=(14, 10))
-        fig.suptitle('ECMP vs HULA: Incast Scenario Comparison', fontsize=16, fontweight='bold')
-        
-        # 1. Throughput comparison
-        ax = axes[0, 0]
-        ecmp_throughput = [f['bits_per_second'] / (1024**2) 
-                          for f in ecmp_data['flows'] if 'bits_per_second' in f]
-        hula_throughput = [f['bits_per_second'] / (1024**2) 
-                          for f in hula_data['flows'] if 'bits_per_second' in f]
-        
-        ax.boxplot([ecmp_throughput, hula_throughput], labels=['ECMP', 'HULA'])
-        ax.set_ylabel('Throughput (Mbps)')
-        ax.set_title('Per-Flow Throughput Distribution')
-        ax.grid(True, alpha=0.3)
-        
-        # 2. Retransmit comparison
-        ax = axes[0, 1]
-        ecmp_retrans = [f.get('retransmits', 0) for f in ecmp_data['flows']]
-        hula_retrans = [f.get('retransmits', 0) for f in hula_data['flows']]
-        
-        x = np.arange(2)
-        width = 0.35
-        ax.bar(x, [np.mean(ecmp_retrans), np.mean(hula_retrans)], width)
-        ax.set_xticks(x)
-        ax.set_xticklabels(['ECMP', 'HULA'])
-        ax.set_ylabel('Average Retransmits')
-        ax.set_title('Packet Retransmissions')
-        ax.grid(True, alpha=0.3, axis='y')
-        
-        # 3. CDF of throughput
-        ax = axes[1, 0]
-        ecmp_sorted = np.sort(ecmp_throughput)
-        hula_sorted = np.sort(hula_throughput)
-        ecmp_cdf = np.arange(1, len(ecmp_sorted) + 1) / len(ecmp_sorted)
-        hula_cdf = np.arange(1, len(hula_sorted) + 1) / len(hula_sorted)
+        _configure_style()
+        fig, axes = _new_figure(2, 2, (14, 10))
+        try:
+            fig.suptitle('ECMP vs HULA: Incast Scenario Comparison', fontsize=16, fontweight='bold')
+            
+            # 1. Throughput comparison
+            ax = axes[0, 0]
+            
+            ax.boxplot([ecmp.throughput, hula.throughput], labels=['ECMP', 'HULA'])
+            ax.set_ylabel('Throughput (Mbps)')
+            ax.set_title('Per-Flow Throughput Distribution')
+            ax.grid(True, alpha=0.3)
+            
+            # 2. Retransmit comparison
+            ax = axes[0, 1]
+            x = np.arange(2)
+            width = 0.35
+            ax.bar(x, [ecmp.retrans.mean(), hula.retrans.mean()], width)
+            ax.set_xticks(x)
+            ax.set_xticklabels(['ECMP', 'HULA'])
+            ax.set_ylabel('Average Retransmits')
+            ax.set_title('Packet Retransmissions')
+            ax.grid(True, alpha=0.3, axis='y')
+            
+            # 3. CDF of throughput
+            ax = axes[1, 0]
+            _, ecmp_cdf, _ = _cdf_and_percentiles(ecmp.throughput, presorted=True)
+            _, hula_cdf, _ = _cdf_and_percentiles(hula.throughput, presorted=True)
+            
+            ax.plot(ecmp.throughput, ecmp_cdf, label='ECMP', linewidth=2)
+            ax.plot(hula.throughput, hula_cdf, label='HULA', linewidth=2)
+            ax.set_xlabel('Throughput (Mbps)')
+            ax.set_ylabel('CDF')
+            ax.set_title('Throughput CDF')
+            ax.legend()
+            ax.grid(True, alpha=0.3)
+            
+            # 4. Summary metrics
+            ax = axes[1, 1]
+            ax.axis('off')
+            
+            stats = {
+                'e_mean': ecmp.mean_tput, 'e_min': ecmp.min_tput,
+                'e_max': ecmp.max_tput, 'e_std': ecmp.std_tput,
+                'e_rt': ecmp.total_retrans,
+                'h_mean': hula.mean_tput, 'h_min': hula.min_tput,
+                'h_max': hula.max_tput, 'h_std': hula.std_tput,
+                'h_rt': hula.total_retrans,
+            }
+            stats['improvement'] = (stats['h_mean'] - stats['e_mean']) / stats['e_mean'] * 100
+            stats['retrans_reduction'] = ((stats['e_rt'] - stats['h_rt'])
+                                          / max(stats['e_rt'], 1) * 100)
+            summary_text = _SUMMARY_TEMPLATE.format_map(stats)
+            
+            ax.text(0.1, 0.5, summary_text, fontsize=10, family='monospace',
+                    verticalalignment='center')
+            
+            output_file = os.path.join(self.output_dir, 'incast_comparison.png')
+            _save_figure(fig, output_file)
+        finally:
+            _release_figure(fig)
         
-        ax.plot(ecmp_sorted, ecmp_cdf, label='ECMP', linewidth=2)
-        ax.plot(hula_sorted, hula_cdf, label='HULA', linewidth=2)
-        ax.set_xlabel('Throughput (Mbps)')
-        ax.set_ylabel('CDF')
-        ax.set_title('Throughput CDF')
-        ax.legend()
-        ax.grid(True, alpha=0.3)
-        
-        # 4. Summary metrics
-        ax = axes[1, 1]
-        ax.axis('off')
-        
-        summary_text = f"""
-        SUMMARY METRICS:
-        
-        ECMP:
-        • Avg Throughput: {np.mean(ecmp_throughput):.2f} Mbps
-        • Min/Max: {np.min(ecmp_throughput):.2f} / {np.max(ecmp_throughput):.2f} Mbps
-        • Std Dev: {np.std(ecmp_throughput):.2f}
-        • Total Retransmits: {sum(ecmp_retrans)}
-        
-        HULA:
-        • Avg Throughput: {np.mean(hula_throughput):.2f} Mbps
-        • Min/Max: {np.min(hula_throughput):.2f} / {np.max(hula_throughput):.2f} Mbps
-        • Std Dev: {np.std(hula_throughput):.2f}
-        • Total Retransmits: {sum(hula_retrans)}
-        
-        IMPROVEMENT:
-        • Throughput: {((np.mean(hula_throughput) - np.mean(ecmp_throughput)) / np.mean(ecmp_throughput) * 100):.1f}%
-        • Retransmits: {((sum(ecmp_retrans) - sum(hula_retrans)) / max(sum(ecmp_retrans), 1) * 100):.1f}% reduction
-        """
-        
-        ax.text(0.1, 0.5, summary_text, fontsize=10, family='monospace',
-                verticalalignment='center')
-        
-        plt.tight_layout()
-        
-        output_file = os.path.join(self.output_dir, 'incast_comparison.png')
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
-        print(f"✓ Saved plot: {output_file}")
-        plt.close()
-    
     def plot_microburst_timeline(self, results_file: str):
         """
         Plot microburst timeline showing burst patterns
@@ -127,45 +193,45 @@ class ResultPlotter:
         Args:
             results_file: Microburst results file
         """
-        data = self.load_results(results_file)
-        bursts = data['bursts']
-        
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 8))
-        fig.suptitle('Microburst Timeline Analysis', fontsize=16, fontweight='bold')
-        
-        # Extract metrics
-        burst_ids = [b['burst_id'] for b in bursts]
-        burst_sizes = [b['actual_size_mb'] for b in bursts]
-        retransmits = [b['total_retransmits'] for b in bursts]
-        durations = [b['duration'] for b in bursts]
-        
-        # 1. Burst size over time
-        ax1.plot(burst_ids, burst_sizes, marker='o', linewidth=2, markersize=8)
-        ax1.axhline(y=np.mean(burst_sizes), color='r', linestyle='--', 
-                   label=f'Mean: {np.mean(burst_sizes):.2f} MB')
-        ax1.set_xlabel('Burst Number')
-        ax1.set_ylabel('Burst Size (MB)')
-        ax1.set_title('Burst Size Over Time')
-        ax1.legend()
-        ax1.grid(True, alpha=0.3)
+        _configure_style()
+        fig, (ax1, ax2) = _new_figure(2, 1, (14, 8))
+        try:
+            fig.suptitle('Microburst Timeline Analysis', fontsize=16, fontweight='bold')
+            
+            # Extract metrics in one streaming pass
+            burst_ids = []
+            burst_sizes = []
+            retransmits = []
+            for b in _stream_bursts(self._path(results_file)):
+                burst_ids.append(b['burst_id'])
+                burst_sizes.append(b['actual_size_mb'])
+                retransmits.append(b['total_retransmits'])
+            
+            # 1. Burst size over time
+            ax1.plot(burst_ids, burst_sizes, marker='o', linewidth=2, markersize=8)
+            ax1.axhline(y=np.mean(burst_sizes), color='r', linestyle='--', 
+                       label=f'Mean: {np.mean(burst_sizes):.2f} MB')
+            ax1.set_xlabel('Burst Number')
+            ax1.set_ylabel('Burst Size (MB)')
+            ax1.set_title('Burst Size Over Time')
+            ax1.legend()
+            ax1.grid(True, alpha=0.3)
+            
+            # 2. Retransmits over time
+            ax2.bar(burst_ids, retransmits, alpha=0.7)
+            ax2.axhline(y=np.mean(retransmits), color='r', linestyle='--',
+                       label=f'Mean: {np.mean(retransmits):.1f}')
+            ax2.set_xlabel('Burst Number')
+            ax2.set_ylabel('Retransmits')
+            ax2.set_title('Retransmissions per Burst')
+            ax2.legend()
+            ax2.grid(True, alpha=0.3, axis='y')
+            
+            output_file = os.path.join(self.output_dir, 'microburst_timeline.png')
+            _save_figure(fig, output_file)
+        finally:
+            _release_figure(fig)
         
-        # 2. Retransmits over time
-        ax2.bar(burst_ids, retransmits, alpha=0.7)
-        ax2.axhline(y=np.mean(retransmits), color='r', linestyle='--',
-                   label=f'Mean: {np.mean(retransmits):.1f}')
-        ax2.set_xlabel('Burst Number')
-        ax2.set_ylabel('Retransmits')
-        ax2.set_title('Retransmissions per Burst')
-        ax2.legend()
-        ax2.grid(True, alpha=0.3, axis='y')
-        
-        plt.tight_layout()
-        
-        output_file = os.path.join(self.output_dir, 'microburst_timeline.png')
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
-        print(f"✓ Saved plot: {output_file}")
-        plt.close()
-    
     def plot_link_failure_recovery(self, results_file: str):
         """
         Plot link failure and recovery metrics
@@ -173,59 +239,46 @@ class ResultPlotter:
         Args:
             results_file: Link failure results file
         """
-        data = self.load_results(results_file)
-        metrics = data['metrics']
-        
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
-        fig.suptitle('Link Failure Recovery Analysis', fontsize=16, fontweight='bold')
+        metrics = _load_scalar_metrics(self._path(results_file))
+        
+        _configure_style()
+        fig, (ax1, ax2) = _new_figure(1, 2, (14, 5))
+        try:
+            fig.suptitle('Link Failure Recovery Analysis', fontsize=16, fontweight='bold')
+            
+            # 1. Throughput across phases
+            phases = ['Baseline', 'Failure', 'Recovery']
+            throughputs = [
+                metrics['baseline_throughput_mbps'],
+                metrics['failure_throughput_mbps'],
+                metrics['recovery_throughput_mbps']
+            ]
+            
+            colors = ['green', 'red', 'orange']
+            bars = ax1.bar(phases, throughputs, color=colors, alpha=0.7)
+            ax1.set_ylabel('Throughput (Mbps)')
+            ax1.set_title('Throughput Across Test Phases')
+            ax1.grid(True, alpha=0.3, axis='y')
+            ax1.bar_label(bars, fmt='%.1f', padding=3)
+            
+            # 2. Retransmissions across phases
+            retransmits = [
+                metrics['baseline_retransmits'],
+                metrics['failure_retransmits'],
+                metrics['recovery_retransmits']
+            ]
+            
+            bars = ax2.bar(phases, retransmits, color=colors, alpha=0.7)
+            ax2.set_ylabel('Retransmits')
+            ax2.set_title('Retransmissions Across Test Phases')
+            ax2.grid(True, alpha=0.3, axis='y')
+            ax2.bar_label(bars, fmt='%d', padding=3)
+            
+            output_file = os.path.join(self.output_dir, 'link_failure_recovery.png')
+            _save_figure(fig, output_file)
+        finally:
+            _release_figure(fig)
         
-        # 1. Throughput across phases
-        phases = ['Baseline', 'Failure', 'Recovery']
-        throughputs = [
-            metrics['baseline_throughput_mbps'],
-            metrics['failure_throughput_mbps'],
-            metrics['recovery_throughput_mbps']
-        ]
-        
-        colors = ['green', 'red', 'orange']
-        bars = ax1.bar(phases, throughputs, color=colors, alpha=0.7)
-        ax1.set_ylabel('Throughput (Mbps)')
-        ax1.set_title('Throughput Across Test Phases')
-        ax1.grid(True, alpha=0.3, axis='y')
-        
-        # Add value labels on bars
-        for bar in bars:
-            height = bar.get_height()
-            ax1.text(bar.get_x() + bar.get_width()/2., height,
-                    f'{height:.1f}',
-                    ha='center', va='bottom')
-        
-        # 2. Retransmissions across phases
-        retransmits = [
-            metrics['baseline_retransmits'],
-            metrics['failure_retransmits'],
-            metrics['recovery_retransmits']
-        ]
-        
-        bars = ax2.bar(phases, retransmits, color=colors, alpha=0.7)
-        ax2.set_ylabel('Retransmits')
-        ax2.set_title('Retransmissions Across Test Phases')
-        ax2.grid(True, alpha=0.3, axis='y')
-        
-        # Add value labels
-        for bar in bars:
-            height = bar.get_height()
-            ax2.text(bar.get_x() + bar.get_width()/2., height,
-                    f'{int(height)}',
-                    ha='center', va='bottom')
-        
-        plt.tight_layout()
-        
-        output_file = os.path.join(self.output_dir, 'link_failure_recovery.png')
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
-        print(f"✓ Saved plot: {output_file}")
-        plt.close()
-    
     def plot_latency_comparison(self, scheme1_file: str, scheme2_file: str,
                                scheme1_name: str = 'ECMP', 
                                scheme2_name: str = 'HULA'):
@@ -238,56 +291,53 @@ class ResultPlotter:
             scheme1_name: Name of first scheme
             scheme2_name: Name of second scheme
         """
-        # Load data
-        data1 = self.load_results(scheme1_file)
-        data2 = self.load_results(scheme2_file)
-        
         # Extract latency (if available in results)
         # Note: iperf3 doesn't directly provide latency, this is a placeholder
         # In real implementation, you'd use ping or custom latency measurements
-        
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
-        fig.suptitle(f'{scheme1_name} vs {scheme2_name}: Latency Analysis', 
-                    fontsize=16, fontweight='bold')
-        
-        # Placeholder: Generate synthetic latency data for demonstration
-        np.random.seed(42)
-        latency1 = np.random.exponential(5, 1000) + 1  # ECMP - higher tail
-        latency2 = np.random.exponential(3, 1000) + 1  # HULA - lower tail
-        
-        # 1. Latency distribution
-        ax1.hist(latency1, bins=50, alpha=0.5, label=scheme1_name, density=True)
-        ax1.hist(latency2, bins=50, alpha=0.5, label=scheme2_name, density=True)
-        ax1.set_xlabel('Latency (ms)')
-        ax1.set_ylabel('Density')
-        ax1.set_title('Latency Distribution')
-        ax1.legend()
-        ax1.grid(True, alpha=0.3)
-        
-        # 2. Tail latency (percentiles)
-        percentiles = [50, 90, 95, 99, 99.9]
-        lat1_percentiles = [np.percentile(latency1, p) for p in percentiles]
-        lat2_percentiles = [np.percentile(latency2, p) for p in percentiles]
-        
-        x = np.arange(len(percentiles))
-        width = 0.35
-        
-        ax2.bar(x - width/2, lat1_percentiles, width, label=scheme1_name, alpha=0.7)
-        ax2.bar(x + width/2, lat2_percentiles, width, label=scheme2_name, alpha=0.7)
-        ax2.set_xlabel('Percentile')
-        ax2.set_ylabel('Latency (ms)')
-        ax2.set_title('Tail Latency (Percentiles)')
-        ax2.set_xticks(x)
-        ax2.set_xticklabels([f'P{p}' for p in percentiles])
-        ax2.legend()
-        ax2.grid(True, alpha=0.3, axis='y')
-        
-        plt.tight_layout()
-        
-        output_file = os.path.join(self.output_dir, 'latency_comparison.png')
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
-        print(f"✓ Saved plot: {output_file}")
-        plt.close()
+        # read from the results files; until then they are not parsed
+        
+        _configure_style()
+        fig, (ax1, ax2) = _new_figure(1, 2, (14, 5))
+        try:
+            fig.suptitle(f'{scheme1_name} vs {scheme2_name}: Latency Analysis', 
+                        fontsize=16, fontweight='bold')
+            
+            # Placeholder: Generate synthetic latency data for demonstration
+            rng = np.random.default_rng(42)
+            latency1 = rng.exponential(5, 1000) + 1  # ECMP - higher tail
+            latency2 = rng.exponential(3, 1000) + 1  # HULA - lower tail
+            
+            # 1. Latency distribution (shared bin edges so densities are comparable)
+            edges = np.histogram_bin_edges(np.concatenate([latency1, latency2]), bins=50)
+            ax1.hist(latency1, bins=edges, alpha=0.5, label=scheme1_name, density=True)
+            ax1.hist(latency2, bins=edges, alpha=0.5, label=scheme2_name, density=True)
+            ax1.set_xlabel('Latency (ms)')
+            ax1.set_ylabel('Density')
+            ax1.set_title('Latency Distribution')
+            ax1.legend()
+            ax1.grid(True, alpha=0.3)
+            
+            # 2. Tail latency (percentiles)
+            _, _, lat1_percentiles = _cdf_and_percentiles(latency1, LATENCY_PERCENTILES)
+            _, _, lat2_percentiles = _cdf_and_percentiles(latency2, LATENCY_PERCENTILES)
+            
+            x = np.arange(len(LATENCY_PERCENTILES))
+            width = 0.35
+            
+            ax2.bar(x - width/2, lat1_percentiles, width, label=scheme1_name, alpha=0.7)
+            ax2.bar(x + width/2, lat2_percentiles, width, label=scheme2_name, alpha=0.7)
+            ax2.set_xlabel('Percentile')
+            ax2.set_ylabel('Latency (ms)')
+            ax2.set_title('Tail Latency (Percentiles)')
+            ax2.set_xticks(x)
+            ax2.set_xticklabels([f'P{p}' for p in LATENCY_PERCENTILES])
+            ax2.legend()
+            ax2.grid(True, alpha=0.3, axis='y')
+            
+            output_file = os.path.join(self.output_dir, 'latency_comparison.png')
+            _save_figure(fig, output_file)
+        finally:
+            _release_figure(fig)
 
 
 def main():
@@ -309,7 +359,9 @@ def main():
     
     if args.all or (args.incast_ecmp and args.incast_hula):
         if args.incast_ecmp and args.incast_hula:
-            plotter.plot_incast_comparison(args.incast_ecmp, args.incast_hula)
+            ecmp = plotter.load_summary(args.incast_ecmp)
+            hula = plotter.load_summary(args.incast_hula)
+            plotter.plot_incast_comparison(ecmp, hula)
             plotter.plot_latency_comparison(args.incast_ecmp, args.incast_hula)
     
     if args.all or args.microburst:
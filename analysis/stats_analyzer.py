@@ -5,15 +5,29 @@ Calculate confidence intervals, significance tests, etc.
 """
 
 import json
+import math
 import os
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+import ijson
 import numpy as np
-import pandas as pd
-from scipy import stats
 from typing import List, Dict, Tuple
+from common import IncastSummary, ResultsDirReader, percentiles, jains_fairness_index
 
+# Tail percentiles reported for per-flow throughput
+PERCENTILES = [50, 90, 95, 99, 99.9]
 
-class StatsAnalyzer:
+# Cohen's d thresholds and the label for each interval between them
+_EFFECT_BINS = np.array([0.2, 0.5, 0.8])
+_EFFECT_LABELS = np.array(['negligible', 'small', 'medium', 'large'])
+
+# ijson events carrying a scalar value
+_SCALAR_EVENTS = ('string', 'number', 'boolean', 'null')
+_START_EVENTS = ('start_map', 'start_array')
+_END_EVENTS = ('end_map', 'end_array')
+
+
+class StatsAnalyzer(ResultsDirReader):
     """Statistical analysis of experimental results"""
     
     def __init__(self, results_dir='../results'):
@@ -21,8 +35,7 @@ class StatsAnalyzer:
     
     def load_results(self, filename: str) -> dict:
         """Load results from JSON file"""
-        filepath = os.path.join(self.results_dir, filename)
-        with open(filepath, 'r') as f:
+        with open(self._path(filename), 'r') as f:
             return json.load(f)
     
     def calculate_confidence_interval(self, data: List[float], 
@@ -37,6 +50,8 @@ class StatsAnalyzer:
         Returns:
             Tuple of (mean, lower_bound, upper_bound)
         """
+        from scipy import stats
+        
         n = len(data)
         mean = np.mean(data)
         std_err = stats.sem(data)
@@ -46,7 +61,7 @@ class StatsAnalyzer:
     
     def t_test_comparison(self, data1: List[float], data2: List[float]) -> Dict:
         """
-        Perform two-sample t-test
+        Perform two-sample Welch's t-test (unequal variances)
         
         Args:
             data1: First dataset
@@ -55,11 +70,22 @@ class StatsAnalyzer:
         Returns:
             Dictionary with test results
         """
-        t_stat, p_value = stats.ttest_ind(data1, data2)
+        from scipy import stats
+        
+        m1 = np.mean(data1)
+        m2 = np.mean(data2)
+        v1 = np.var(data1, ddof=1)
+        v2 = np.var(data2, ddof=1)
+        
+        # Reuse the moments instead of letting scipy rescan the data
+        t_stat, p_value = stats.ttest_ind_from_stats(
+            m1, math.sqrt(v1), len(data1),
+            m2, math.sqrt(v2), len(data2),
+            equal_var=False
+        )
         
         # Calculate effect size (Cohen's d)
-        pooled_std = np.sqrt((np.std(data1)**2 + np.std(data2)**2) / 2)
-        cohens_d = (np.mean(data1) - np.mean(data2)) / pooled_std
+        cohens_d = (m1 - m2) / math.sqrt(0.5 * (v1 + v2))
         
         return {
             't_statistic': t_stat,
@@ -69,64 +95,45 @@ class StatsAnalyzer:
             'effect_size': self._interpret_effect_size(cohens_d)
         }
     
-    def _interpret_effect_size(self, d: float) -> str:
-        """Interpret Cohen's d effect size"""
-        d_abs = abs(d)
-        if d_abs < 0.2:
-            return 'negligible'
-        elif d_abs < 0.5:
-            return 'small'
-        elif d_abs < 0.8:
-            return 'medium'
-        else:
-            return 'large'
-    
-    def analyze_incast_comparison(self, ecmp_file: str, hula_file: str):
+    def _interpret_effect_size(self, d):
+        """Interpret Cohen's d effect size (scalar or array)"""
+        return _EFFECT_LABELS[np.digitize(np.abs(d), _EFFECT_BINS)]
+    
+    def analyze_incast_comparison(self, ecmp: IncastSummary, hula: IncastSummary):
         """
         Comprehensive analysis of ECMP vs HULA incast results
         
         Args:
-            ecmp_file: ECMP results file
-            hula_file: HULA results file
+            ecmp: ECMP incast summary
+            hula: HULA incast summary
         """
         print("\n" + "="*70)
         print("INCAST SCENARIO: STATISTICAL ANALYSIS")
         print("="*70 + "\n")
         
-        # Load data
-        ecmp_data = self.load_results(ecmp_file)
-        hula_data = self.load_results(hula_file)
-        
-        # Extract metrics
-        ecmp_throughput = [f['bits_per_second'] / (1024**2) 
-                          for f in ecmp_data['flows'] if 'bits_per_second' in f]
-        hula_throughput = [f['bits_per_second'] / (1024**2) 
-                          for f in hula_data['flows'] if 'bits_per_second' in f]
-        
-        ecmp_retrans = [f.get('retransmits', 0) for f in ecmp_data['flows']]
-        hula_retrans = [f.get('retransmits', 0) for f in hula_data['flows']]
-        
         # Throughput analysis
         print("THROUGHPUT ANALYSIS:")
         print("-" * 70)
         
-        ecmp_mean, ecmp_ci_low, ecmp_ci_high = self.calculate_confidence_interval(ecmp_throughput)
-        hula_mean, hula_ci_low, hula_ci_high = self.calculate_confidence_interval(hula_throughput)
+        ecmp_mean, ecmp_ci_low, ecmp_ci_high = self.calculate_confidence_interval(ecmp.throughput)
+        hula_mean, hula_ci_low, hula_ci_high = self.calculate_confidence_interval(hula.throughput)
         
         print(f"ECMP:")
         print(f"  Mean: {ecmp_mean:.2f} Mbps")
         print(f"  95% CI: [{ecmp_ci_low:.2f}, {ecmp_ci_high:.2f}]")
-        print(f"  Std Dev: {np.std(ecmp_throughput):.2f}")
-        print(f"  Min/Max: {np.min(ecmp_throughput):.2f} / {np.max(ecmp_throughput):.2f}")
+        print(f"  Std Dev: {ecmp.std_tput:.2f}")
+        print(f"  Min/Max: {ecmp.min_tput:.2f} / {ecmp.max_tput:.2f}")
+        self._print_percentiles(ecmp.throughput)
         
         print(f"\nHULA:")
         print(f"  Mean: {hula_mean:.2f} Mbps")
         print(f"  95% CI: [{hula_ci_low:.2f}, {hula_ci_high:.2f}]")
-        print(f"  Std Dev: {np.std(hula_throughput):.2f}")
-        print(f"  Min/Max: {np.min(hula_throughput):.2f} / {np.max(hula_throughput):.2f}")
+        print(f"  Std Dev: {hula.std_tput:.2f}")
+        print(f"  Min/Max: {hula.min_tput:.2f} / {hula.max_tput:.2f}")
+        self._print_percentiles(hula.throughput)
         
         # Statistical test
-        t_test = self.t_test_comparison(ecmp_throughput, hula_throughput)
+        t_test = self.t_test_comparison(ecmp.throughput, hula.throughput)
         
         print(f"\nStatistical Significance Test:")
         print(f"  t-statistic: {t_test['t_statistic']:.4f}")
@@ -142,10 +149,13 @@ class StatsAnalyzer:
         print("RETRANSMIT ANALYSIS:")
         print("-" * 70)
         
-        print(f"ECMP Total Retransmits: {sum(ecmp_retrans)}")
-        print(f"HULA Total Retransmits: {sum(hula_retrans)}")
+        ecmp_total_retrans = ecmp.total_retrans
+        hula_total_retrans = hula.total_retrans
+        
+        print(f"ECMP Total Retransmits: {ecmp_total_retrans}")
+        print(f"HULA Total Retransmits: {hula_total_retrans}")
         
-        retrans_reduction = ((sum(ecmp_retrans) - sum(hula_retrans)) / max(sum(ecmp_retrans), 1)) * 100
+        retrans_reduction = ((ecmp_total_retrans - hula_total_retrans) / max(ecmp_total_retrans, 1)) * 100
         print(f"Retransmit Reduction: {retrans_reduction:.2f}%")
         
         # Fairness analysis (Jain's Fairness Index)
@@ -153,8 +163,8 @@ class StatsAnalyzer:
         print("FAIRNESS ANALYSIS:")
         print("-" * 70)
         
-        ecmp_jfi = self.jains_fairness_index(ecmp_throughput)
-        hula_jfi = self.jains_fairness_index(hula_throughput)
+        ecmp_jfi = ecmp.jfi
+        hula_jfi = hula.jfi
         
         print(f"Jain's Fairness Index (0-1, higher is better):")
         print(f"  ECMP: {ecmp_jfi:.4f}")
@@ -163,6 +173,12 @@ class StatsAnalyzer:
         
         print("\n" + "="*70 + "\n")
     
+    def _print_percentiles(self, data: np.ndarray):
+        """Print tail percentiles of a throughput array"""
+        values = percentiles(data, PERCENTILES)
+        labels = " / ".join(f"P{p}" for p in PERCENTILES)
+        print(f"  {labels}: " + " / ".join(f"{v:.2f}" for v in values))
+    
     def jains_fairness_index(self, data: List[float]) -> float:
         """
         Calculate Jain's Fairness Index
@@ -173,49 +189,88 @@ class StatsAnalyzer:
         Returns:
             Fairness index (0 to 1)
         """
-        n = len(data)
-        if n == 0:
-            return 0.0
-        
-        sum_x = sum(data)
-        sum_x_sq = sum(x**2 for x in data)
-        
-        return (sum_x ** 2) / (n * sum_x_sq)
+        return jains_fairness_index(np.asarray(data, dtype=np.float64))
     
     def generate_summary_report(self, output_file: str = '../results/summary_report.txt'):
         """Generate comprehensive summary report"""
         
         # Find all result files
-        result_files = [f for f in os.listdir(self.results_dir) 
-                       if f.endswith('.json')]
+        with os.scandir(self.results_dir) as it:
+            result_paths = [e.path for e in it
+                            if e.is_file() and e.name.endswith('.json')]
         
         with open(output_file, 'w') as f:
             f.write("="*70 + "\n")
             f.write("EXPERIMENTAL RESULTS SUMMARY REPORT\n")
             f.write("="*70 + "\n\n")
             
-            for result_file in result_files:
-                f.write(f"File: {result_file}\n")
-                f.write("-" * 70 + "\n")
-                
-                try:
-                    data = self.load_results(result_file)
-                    f.write(f"Test Type: {data.get('test_type', 'unknown')}\n")
-                    f.write(f"Timestamp: {data.get('timestamp', 'unknown')}\n")
+            # Parse headers in parallel; map() preserves file order for the writes
+            with ProcessPoolExecutor() as ex:
+                for path, header in zip(result_paths,
+                                        ex.map(_extract_header, result_paths, chunksize=4)):
+                    f.write(f"File: {os.path.basename(path)}\n")
+                    f.write("-" * 70 + "\n")
                     
-                    if 'metrics' in data:
+                    if 'error' in header:
+                        f.write(f"Error processing file: {header['error']}\n\n")
+                        continue
+                    
+                    f.write(f"Test Type: {header.get('test_type', 'unknown')}\n")
+                    f.write(f"Timestamp: {header.get('timestamp', 'unknown')}\n")
+                    
+                    if header.get('metrics'):
                         f.write("\nMetrics:\n")
-                        for key, value in data['metrics'].items():
+                        for key, value in header['metrics'].items():
                             f.write(f"  {key}: {value}\n")
                     
                     f.write("\n")
-                    
-                except Exception as e:
-                    f.write(f"Error processing file: {e}\n\n")
         
         print(f"✓ Summary report saved to {output_file}")
 
 
+def _extract_header(path: str) -> Dict:
+    """
+    Read test_type, timestamp and the top-level metrics from a results file
+    
+    Streams the file so per-flow data is never materialized. Nested metric
+    values are rebuilt in full. Errors are returned rather than raised so
+    one bad file does not abort the report.
+    
+    Args:
+        path: Path to results JSON file
+    
+    Returns:
+        Dictionary with 'test_type', 'timestamp', 'metrics' (or 'error')
+    """
+    header = {'metrics': {}}
+    metrics = header['metrics']
+    builder = None
+    metric_prefix = None
+    try:
+        with open(path, 'rb') as f:
+            for prefix, event, value in ijson.parse(f, use_float=True):
+                if builder is not None:
+                    # Inside a nested metric value until its closing event
+                    builder.event(event, value)
+                    if prefix == metric_prefix and event in _END_EVENTS:
+                        metrics[metric_prefix[len('metrics.'):]] = builder.value
+                        builder = None
+                    continue
+                if prefix in ('test_type', 'timestamp'):
+                    if event in _SCALAR_EVENTS:
+                        header[prefix] = value
+                elif prefix.startswith('metrics.') and prefix.count('.') == 1:
+                    if event in _SCALAR_EVENTS:
+                        metrics[prefix[len('metrics.'):]] = value
+                    elif event in _START_EVENTS:
+                        metric_prefix = prefix
+                        builder = ijson.ObjectBuilder()
+                        builder.event(event, value)
+    except Exception as e:
+        return {'error': str(e)}
+    return header
+
+
 def main():
     parser = argparse.ArgumentParser(description='Statistical Analysis')
     parser.add_argument('--results-dir', default='../results',
@@ -230,7 +285,9 @@ def main():
     analyzer = StatsAnalyzer(args.results_dir)
     
     if args.incast_ecmp and args.incast_hula:
-        analyzer.analyze_incast_comparison(args.incast_ecmp, args.incast_hula)
+        ecmp = analyzer.load_summary(args.incast_ecmp)
+        hula = analyzer.load_summary(args.incast_hula)
+        analyzer.analyze_incast_comparison(ecmp, hula)
     
     if args.summary:
         analyzer.generate_summary_report()
@@ -3,11 +3,22 @@
 ECMP Controller - Populate routing tables for ECMP load balancing
 """
 
+import os
 import sys
-import json
+import ipaddress
+import logging
 import argparse
-from switch_manager import SwitchManager, ip_to_int, mac_to_bytes, int_to_bytes
-from bm_runtime.standard.ttypes import BmMatchParam, BmMatchParamType
+import ijson
+from switch_manager import SwitchManager, mac_to_bytes, int_to_bytes
+from bm_runtime.standard.ttypes import (
+    BmMatchParam, BmMatchParamType, BmMatchParamExact, BmMatchParamLPM
+)
+
+logger = logging.getLogger('nap.ecmp')
+
+# Match types bound once at import for the per-entry builders
+_EXACT = BmMatchParamType.EXACT
+_LPM = BmMatchParamType.LPM
 
 
 class ECMPController:
@@ -15,7 +26,7 @@ class ECMPController:
     
     def __init__(self, switch_addr='localhost', thrift_port=9090):
         self.manager = SwitchManager(switch_addr, thrift_port)
-        self.topology = None
+        self.topology_file = None
     
     def connect(self):
         """Connect to switch"""
@@ -26,32 +37,44 @@ class ECMPController:
         self.manager.disconnect()
     
     def load_topology(self, topology_file: str):
-        """Load topology configuration from JSON file"""
-        try:
-            with open(topology_file, 'r') as f:
-                self.topology = json.load(f)
-            print(f"✓ Loaded topology from {topology_file}")
-            return True
-        except Exception as e:
-            print(f"✗ Failed to load topology: {e}")
+        """
+        Select topology configuration JSON file
+        
+        Switch configs are streamed from the file by iter_switches()
+        rather than parsed up front.
+        """
+        if not os.path.isfile(topology_file):
+            print(f"✗ Failed to load topology: no such file {topology_file}")
             return False
+        
+        self.topology_file = topology_file
+        print(f"✓ Loaded topology from {topology_file}")
+        return True
     
-    def add_ecmp_group(self, dst_prefix: str, prefix_len: int, 
-                       group_id: int, num_paths: int):
+    def iter_switches(self):
+        """Yield switch configs one at a time from the topology file"""
+        with open(self.topology_file, 'rb') as f:
+            yield from ijson.items(f, 'switches.item', use_float=True)
+    
+    def ecmp_group_entry(self, dst_prefix: str, prefix_len: int,
+                         group_id: int, num_paths: int):
         """
-        Add ECMP group entry for destination prefix
+        Build ECMP group entry for destination prefix
         
         Args:
             dst_prefix: Destination IP prefix (e.g., "10.0.1.0")
             prefix_len: Prefix length (e.g., 24)
             group_id: ECMP group ID
             num_paths: Number of equal-cost paths
+        
+        Returns:
+            (match_fields, action_name, action_params) tuple for "ecmp_group"
         """
         match_fields = [
             BmMatchParam(
-                type=BmMatchParamType.LPM,
+                type=_LPM,
                 lpm=BmMatchParamLPM(
-                    key=int_to_bytes(ip_to_int(dst_prefix), 4),
+                    key=ipaddress.IPv4Address(dst_prefix).packed,
                     prefix_length=prefix_len
                 )
             )
@@ -62,31 +85,37 @@ class ECMPController:
             int_to_bytes(num_paths, 2)       # num_nhops
         ]
         
+        return match_fields, "set_ecmp_group", action_params
+    
+    def add_ecmp_group(self, dst_prefix: str, prefix_len: int, 
+                       group_id: int, num_paths: int):
+        """Add ECMP group entry for destination prefix"""
         return self.manager.add_table_entry(
             "ecmp_group",
-            match_fields,
-            "set_ecmp_group",
-            action_params
+            *self.ecmp_group_entry(dst_prefix, prefix_len, group_id, num_paths)
         )
     
-    def add_next_hop(self, group_id: int, hash_val: int, 
-                     port: int, dst_mac: str):
+    def next_hop_entry(self, group_id: int, hash_val: int,
+                       port: int, dst_mac: str):
         """
-        Add next-hop entry for ECMP group
+        Build next-hop entry for ECMP group
         
         Args:
             group_id: ECMP group ID
             hash_val: Hash value (0 to num_paths-1)
             port: Egress port
             dst_mac: Destination MAC address
+        
+        Returns:
+            (match_fields, action_name, action_params) tuple for "ecmp_nhop"
         """
         match_fields = [
             BmMatchParam(
-                type=BmMatchParamType.EXACT,
+                type=_EXACT,
                 exact=BmMatchParamExact(key=int_to_bytes(group_id, 2))
             ),
             BmMatchParam(
-                type=BmMatchParamType.EXACT,
+                type=_EXACT,
                 exact=BmMatchParamExact(key=int_to_bytes(hash_val, 2))
             )
         ]
@@ -96,11 +125,14 @@ class ECMPController:
             int_to_bytes(port, 2)            # port (9 bits, use 2 bytes)
         ]
         
+        return match_fields, "set_nhop", action_params
+    
+    def add_next_hop(self, group_id: int, hash_val: int, 
+                     port: int, dst_mac: str):
+        """Add next-hop entry for ECMP group"""
         return self.manager.add_table_entry(
             "ecmp_nhop",
-            match_fields,
-            "set_nhop",
-            action_params
+            *self.next_hop_entry(group_id, hash_val, port, dst_mac)
         )
     
     def configure_switch(self, switch_config: dict):
@@ -125,6 +157,9 @@ class ECMPController:
         """
         print(f"\n=== Configuring switch {switch_config['switch_id']} ===")
         
+        group_entries = []
+        nhop_entries = []
+        
         for group in switch_config.get('ecmp_groups', []):
             # Parse prefix
             prefix_parts = group['dst_prefix'].split('/')
@@ -135,34 +170,46 @@ class ECMPController:
             next_hops = group['next_hops']
             num_paths = len(next_hops)
             
-            # Add ECMP group
-            print(f"\nAdding ECMP group {group_id} for {group['dst_prefix']}")
-            self.add_ecmp_group(dst_prefix, prefix_len, group_id, num_paths)
+            # Queue ECMP group
+            logger.debug("Adding ECMP group %d for %s", group_id, group['dst_prefix'])
+            group_entries.append(
+                self.ecmp_group_entry(dst_prefix, prefix_len, group_id, num_paths)
+            )
             
-            # Add next hops
+            # Queue next hops
             for idx, nhop in enumerate(next_hops):
-                print(f"  Next hop {idx}: port={nhop['port']}, mac={nhop['mac']}")
-                self.add_next_hop(
+                logger.debug("  Next hop %d: port=%s, mac=%s", idx, nhop['port'], nhop['mac'])
+                nhop_entries.append(self.next_hop_entry(
                     group_id, 
                     idx, 
                     nhop['port'], 
                     nhop['mac']
-                )
+                ))
+        
+        # Install everything in two pipelined batches
+        self.manager.add_table_entries("ecmp_group", group_entries)
+        self.manager.add_table_entries("ecmp_nhop", nhop_entries)
         
         print(f"\n✓ Switch {switch_config['switch_id']} configured")
     
     def populate_from_topology(self):
         """Populate all switches from loaded topology"""
-        if not self.topology:
+        if not self.topology_file:
             print("✗ No topology loaded")
             return False
         
-        for switch in self.topology.get('switches', []):
-            if not self.connect():
-                continue
-            
-            self.configure_switch(switch)
-            self.disconnect()
+        # Reuse one connection for every switch config instead of
+        # reconnecting per iteration
+        if not self.manager.is_connected() and not self.connect():
+            return False
+        
+        # Each switch is configured as soon as it is parsed, then freed
+        try:
+            for switch in self.iter_switches():
+                self.configure_switch(switch)
+        except (OSError, ijson.JSONError) as e:
+            print(f"✗ Failed to read topology: {e}")
+            return False
             
         return True
     
@@ -183,9 +230,14 @@ def main():
                        help='Topology configuration file')
     parser.add_argument('--clear', action='store_true',
                        help='Clear all tables before configuring')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                       help='Log every table entry')
     
     args = parser.parse_args()
     
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format='%(message)s')
+    
     controller = ECMPController(args.switch, args.port)
     
     if not controller.connect():
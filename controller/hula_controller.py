@@ -3,14 +3,41 @@
 HULA Controller - Manage probe injection and routing table updates
 """
 
+import os
 import sys
-import json
 import time
+import logging
+import struct
+import asyncio
+import ipaddress
 import argparse
 import threading
-from scapy.all import Ether, Raw, sendp
-from switch_manager import SwitchManager, ip_to_int, mac_to_bytes, int_to_bytes
-from bm_runtime.standard.ttypes import BmMatchParam, BmMatchParamType
+from typing import List, Tuple, Union
+import orjson
+from probe_socket import ProbeSocket
+from switch_manager import (
+    SwitchManager, ip_batch_to_int, mac_to_bytes, int_to_bytes
+)
+from bm_runtime.standard.ttypes import (
+    BmMatchParam, BmMatchParamType, BmMatchParamExact, BmMatchParamLPM
+)
+
+logger = logging.getLogger('nap.hula')
+
+# Match types bound once at import for the per-entry builders
+_EXACT = BmMatchParamType.EXACT
+_LPM = BmMatchParamType.LPM
+
+# HULA probe header: type | hop_count | path_util | timestamp | dst_tor
+_HULA = struct.Struct('>BBHII')
+_HULA_TS = struct.Struct('>I')
+
+# Byte offset of the HULA timestamp field within a probe frame
+# (Ethernet 14B + type 1B + hop_count 1B + path_util 2B)
+PROBE_TS_OFFSET = 18
+
+# HULA header type value for probe requests
+PROBE_REQUEST = 1
 
 
 class HULAController:
@@ -21,7 +48,11 @@ class HULAController:
         self.topology = None
         self.probe_interval = 0.1  # 100ms probe interval
         self.probe_thread = None
+        self.probe_socket = None
         self.running = False
+        self._stop_event = threading.Event()
+        self._probe_frames = {}  # (dst_tor_id, src_mac, dst_mac) -> bytearray
+        self._compiled_probes = None  # [(frame, timestamp offset)] for the injector
     
     def connect(self):
         """Connect to switch"""
@@ -32,32 +63,73 @@ class HULAController:
         self.manager.disconnect()
     
     def load_topology(self, topology_file: str):
-        """Load topology configuration"""
+        """
+        Load topology configuration
+        
+        The parsed topology is saved next to the JSON file as compact
+        orjson together with the source's size and mtime_ns, and reused on
+        later starts while both still match. The cache holds plain data
+        only, so a tampered file can at worst fail to parse.
+        """
+        cache_path = topology_file + '.cache'
+        try:
+            st = os.stat(topology_file)
+            key = [st.st_size, st.st_mtime_ns]
+        except OSError as e:
+            print(f"✗ Failed to load topology: {e}")
+            return False
+        
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'rb') as f:
+                    cached = orjson.loads(f.read())
+                if isinstance(cached, dict) and cached.get('key') == key and 'topology' in cached:
+                    self.topology = cached['topology']
+                    print(f"✓ Loaded topology from {topology_file} (cached)")
+                    return True
+                logger.info("Topology cache %s is stale, re-parsing", cache_path)
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring unreadable topology cache %s: %s", cache_path, e)
+        
         try:
-            with open(topology_file, 'r') as f:
-                self.topology = json.load(f)
+            with open(topology_file, 'rb') as f:
+                self.topology = orjson.loads(f.read())
             print(f"✓ Loaded topology from {topology_file}")
-            return True
         except Exception as e:
             print(f"✗ Failed to load topology: {e}")
             return False
+        
+        try:
+            with open(cache_path, 'wb') as f:
+                f.write(orjson.dumps({'key': key, 'topology': self.topology}))
+        except (OSError, ValueError) as e:
+            logger.warning("Could not write topology cache %s: %s", cache_path, e)
+        return True
     
-    def add_flowlet_entry(self, dst_prefix: str, prefix_len: int,
-                         port: int, dst_mac: str):
+    def flowlet_entry(self, dst_prefix: Union[str, int], prefix_len: int,
+                      port: int, dst_mac: str):
         """
-        Add flowlet table entry for destination
+        Build flowlet table entry for destination
         
         Args:
-            dst_prefix: Destination IP prefix
+            dst_prefix: Destination IP prefix (dotted string or preconverted int)
             prefix_len: Prefix length
             port: Egress port
             dst_mac: Destination MAC address
+        
+        Returns:
+            (match_fields, action_name, action_params) tuple for "flowlet_table"
         """
+        if isinstance(dst_prefix, str):
+            key = ipaddress.IPv4Address(dst_prefix).packed
+        else:
+            key = dst_prefix.to_bytes(4, 'big')
+        
         match_fields = [
             BmMatchParam(
-                type=BmMatchParamType.LPM,
+                type=_LPM,
                 lpm=BmMatchParamLPM(
-                    key=int_to_bytes(ip_to_int(dst_prefix), 4),
+                    key=key,
                     prefix_length=prefix_len
                 )
             )
@@ -68,25 +140,31 @@ class HULAController:
             int_to_bytes(port, 2)
         ]
         
+        return match_fields, "set_nhop", action_params
+    
+    def add_flowlet_entry(self, dst_prefix: Union[str, int], prefix_len: int,
+                         port: int, dst_mac: str):
+        """Add flowlet table entry for destination"""
         return self.manager.add_table_entry(
             "flowlet_table",
-            match_fields,
-            "set_nhop",
-            action_params
+            *self.flowlet_entry(dst_prefix, prefix_len, port, dst_mac)
         )
     
-    def add_probe_forwarding_entry(self, dst_tor_id: int, port: int, dst_mac: str):
+    def probe_forwarding_entry(self, dst_tor_id: int, port: int, dst_mac: str):
         """
-        Add probe forwarding entry
+        Build probe forwarding entry
         
         Args:
             dst_tor_id: Destination ToR switch ID
             port: Egress port for probes
             dst_mac: MAC address for probes
+        
+        Returns:
+            (match_fields, action_name, action_params) tuple for "probe_fwd_table"
         """
         match_fields = [
             BmMatchParam(
-                type=BmMatchParamType.EXACT,
+                type=_EXACT,
                 exact=BmMatchParamExact(key=int_to_bytes(dst_tor_id, 4))
             )
         ]
@@ -96,11 +174,13 @@ class HULAController:
             int_to_bytes(port, 2)
         ]
         
+        return match_fields, "set_nhop", action_params
+    
+    def add_probe_forwarding_entry(self, dst_tor_id: int, port: int, dst_mac: str):
+        """Add probe forwarding entry"""
         return self.manager.add_table_entry(
             "probe_fwd_table",
-            match_fields,
-            "set_nhop",
-            action_params
+            *self.probe_forwarding_entry(dst_tor_id, port, dst_mac)
         )
     
     def configure_switch(self, switch_config: dict):
@@ -112,28 +192,27 @@ class HULAController:
         """
         print(f"\n=== Configuring HULA switch {switch_config['switch_id']} ===")
         
-        # Add flowlet entries
-        for entry in switch_config.get('flowlet_entries', []):
-            prefix_parts = entry['dst_prefix'].split('/')
-            dst_prefix = prefix_parts[0]
-            prefix_len = int(prefix_parts[1])
-            
-            print(f"Adding flowlet entry for {entry['dst_prefix']}")
-            self.add_flowlet_entry(
-                dst_prefix,
-                prefix_len,
-                entry['port'],
-                entry['mac']
-            )
+        # Flowlet entries (all prefixes converted in one pass up front)
+        flowlet_configs = switch_config.get('flowlet_entries', [])
+        prefixes = [entry['dst_prefix'].split('/') for entry in flowlet_configs]
+        dst_ips = ip_batch_to_int(p[0] for p in prefixes)
         
-        # Add probe forwarding entries
-        for entry in switch_config.get('probe_entries', []):
-            print(f"Adding probe forwarding for ToR {entry['dst_tor_id']}")
-            self.add_probe_forwarding_entry(
-                entry['dst_tor_id'],
-                entry['port'],
-                entry['mac']
-            )
+        flowlet_entries = [
+            self.flowlet_entry(dst_ip, int(prefix_len), entry['port'], entry['mac'])
+            for entry, (_, prefix_len), dst_ip in zip(flowlet_configs, prefixes, dst_ips)
+        ]
+        
+        # Probe forwarding entries
+        probe_entries = [
+            self.probe_forwarding_entry(entry['dst_tor_id'], entry['port'], entry['mac'])
+            for entry in switch_config.get('probe_entries', [])
+        ]
+        
+        # Install each table in one pipelined batch
+        num_flowlet = self.manager.add_table_entries("flowlet_table", flowlet_entries)
+        num_probe = self.manager.add_table_entries("probe_fwd_table", probe_entries)
+        logger.info("configured %d/%d flowlet, %d/%d probe entries",
+                    num_flowlet, len(flowlet_entries), num_probe, len(probe_entries))
         
         print(f"✓ Switch {switch_config['switch_id']} configured")
     
@@ -141,26 +220,52 @@ class HULAController:
         """
         Create HULA probe packet
         
+        The frame is built once per (dst_tor_id, src_mac, dst_mac) and cached;
+        later calls only rewrite the timestamp field in place.
+        
         Args:
             dst_tor_id: Destination ToR ID
             src_mac: Source MAC address
             dst_mac: Destination MAC address
         
         Returns:
-            Scapy packet
+            Raw probe frame (bytearray, shared between calls)
         """
         # HULA probe format:
         # Ethernet (14B) | HULA header (12B)
         # HULA: type(1B) | hop_count(1B) | path_util(2B) | timestamp(4B) | dst_tor(4B)
         
-        hula_header = bytes([
-            1,              # type = PROBE_REQUEST
-            0,              # hop_count = 0
-            0, 0,           # path_util = 0
-        ]) + int_to_bytes(int(time.time()), 4) + int_to_bytes(dst_tor_id, 4)
+        key = (dst_tor_id, src_mac, dst_mac)
+        frame = self._probe_frames.get(key)
+        if frame is None:
+            # scapy is only needed to build frames, so configure-only runs skip its import
+            from scapy.layers.l2 import Ether
+            from scapy.packet import Raw
+            
+            hula_header = _HULA.pack(PROBE_REQUEST, 0, 0, 0, dst_tor_id)
+            
+            pkt = Ether(src=src_mac, dst=dst_mac, type=0x1234) / Raw(load=hula_header)
+            frame = self._probe_frames[key] = bytearray(bytes(pkt))
         
-        pkt = Ether(src=src_mac, dst=dst_mac, type=0x1234) / Raw(load=hula_header)
-        return pkt
+        _HULA_TS.pack_into(frame, PROBE_TS_OFFSET, int(time.time()) & 0xFFFFFFFF)
+        return frame
+    
+    def compile_probes(self, probe_config: dict) -> List[Tuple[bytearray, int]]:
+        """
+        Serialize every configured probe once
+        
+        Args:
+            probe_config: Configuration for probe injection
+        
+        Returns:
+            List of (frame, timestamp offset) pairs; the injector only
+            rewrites the timestamp of each frame per tick
+        """
+        return [
+            (self.create_hula_probe(probe['dst_tor_id'], probe['src_mac'], probe['dst_mac']),
+             PROBE_TS_OFFSET)
+            for probe in probe_config.get('probes', [])
+        ]
     
     def inject_probes(self, interface: str, probe_config: dict):
         """
@@ -172,20 +277,73 @@ class HULAController:
         """
         print(f"\n=== Starting probe injection on {interface} ===")
         
-        while self.running:
-            for probe in probe_config.get('probes', []):
-                pkt = self.create_hula_probe(
-                    probe['dst_tor_id'],
-                    probe['src_mac'],
-                    probe['dst_mac']
-                )
-                sendp(pkt, iface=interface, verbose=False)
+        # Called directly rather than via start_probe_injection(): open a
+        # socket for this run and close it again when the loop ends
+        owns_socket = self.probe_socket is None
+        if owns_socket:
+            try:
+                self.probe_socket = ProbeSocket(interface)
+            except OSError as e:
+                print(f"✗ Failed to open probe socket on {interface}: {e}")
+                return
+        
+        frames = self._compiled_probes
+        if frames is None:
+            frames = self._compiled_probes = self.compile_probes(probe_config)
+            self.probe_socket.load([frame for frame, _ in frames])
+        elif owns_socket:
+            self.probe_socket.load([frame for frame, _ in frames])
+        
+        try:
+            self._probe_loop(interface, frames)
+        finally:
+            if owns_socket:
+                self.probe_socket.close()
+                self.probe_socket = None
+    
+    def _probe_loop(self, interface: str, frames: List[Tuple[bytearray, int]]):
+        """Stamp and burst the loaded frames every probe interval until stopped"""
+        burst = self.probe_socket.send_burst
+        pack_into = _HULA_TS.pack_into
+        stop = self._stop_event
+        interval = self.probe_interval
+        
+        # Ticks sit on a fixed monotonic grid so send time does not add drift
+        next_tick = time.monotonic()
+        while not stop.is_set():
+            ts = int(time.time()) & 0xFFFFFFFF
+            for frame, offset in frames:
+                pack_into(frame, offset, ts)
+            try:
+                burst()
+            except OSError as e:
+                logger.error("✗ Probe injection on %s stopped: %s", interface, e)
+                break
             
-            time.sleep(self.probe_interval)
+            next_tick += interval
+            dt = next_tick - time.monotonic()
+            if dt > 0:
+                stop.wait(dt)
+            elif dt < -interval:
+                # Fell more than a tick behind: resync instead of bursting to catch up
+                next_tick = time.monotonic()
     
     def start_probe_injection(self, interface: str, probe_config: dict):
         """Start probe injection in background thread"""
+        # Build all frames up front so no scapy objects are created while injecting
+        self._compiled_probes = self.compile_probes(probe_config)
+        
+        try:
+            # One raw socket for the lifetime of the injector; each tick is
+            # a single sendmmsg() over the precompiled frames
+            self.probe_socket = ProbeSocket(interface)
+            self.probe_socket.load([frame for frame, _ in self._compiled_probes])
+        except Exception as e:
+            print(f"✗ Failed to open probe socket on {interface}: {e}")
+            return False
+        
         self.running = True
+        self._stop_event.clear()
         self.probe_thread = threading.Thread(
             target=self.inject_probes,
             args=(interface, probe_config)
@@ -193,12 +351,18 @@ class HULAController:
         self.probe_thread.daemon = True
         self.probe_thread.start()
         print("✓ Probe injection started")
+        return True
     
     def stop_probe_injection(self):
         """Stop probe injection"""
         self.running = False
+        self._stop_event.set()
         if self.probe_thread:
             self.probe_thread.join()
+            self.probe_thread = None
+        if self.probe_socket:
+            self.probe_socket.close()
+            self.probe_socket = None
         print("✓ Probe injection stopped")
     
     def monitor_path_utilization(self, duration: int = 60):
@@ -208,17 +372,43 @@ class HULAController:
         Args:
             duration: Monitoring duration in seconds
         """
+        asyncio.run(self.monitor_path_utilization_async(duration))
+    
+    async def monitor_path_utilization_async(self, duration: int = 60, poll_interval: float = 5.0):
+        """
+        Poll path utilization registers without blocking the event loop
+        
+        Both registers are read concurrently, each on its own Thrift
+        connection, so a cycle costs about one RTT instead of two.
+        
+        Args:
+            duration: Monitoring duration in seconds
+            poll_interval: Seconds between polls
+        """
         print(f"\n=== Monitoring path utilization for {duration}s ===")
         
-        start_time = time.time()
-        while time.time() - start_time < duration:
-            print("\nCurrent path utilization:")
-            for tor_id in range(1, 4):  # Assume 3 ToR switches
-                util = self.manager.read_register("path_util_reg", tor_id)
-                port = self.manager.read_register("best_port_reg", tor_id)
-                print(f"  ToR {tor_id}: util={util}, best_port={port}")
-            
-            time.sleep(5)
+        loop = asyncio.get_running_loop()
+        # Second connection for the best-port reads; share ours if it fails
+        port_manager = self.manager.clone() or self.manager
+        
+        try:
+            deadline = loop.time() + duration
+            while loop.time() < deadline:
+                utils, ports = await asyncio.gather(
+                    loop.run_in_executor(None, self.manager.read_register_all, "path_util_reg"),
+                    loop.run_in_executor(None, port_manager.read_register_all, "best_port_reg")
+                )
+                
+                print("\nCurrent path utilization:")
+                for tor_id in range(1, 4):  # Assume 3 ToR switches
+                    util = utils[tor_id] if tor_id < len(utils) else -1
+                    port = ports[tor_id] if tor_id < len(ports) else -1
+                    print(f"  ToR {tor_id}: util={util}, best_port={port}")
+                
+                await asyncio.sleep(poll_interval)
+        finally:
+            if port_manager is not self.manager:
+                port_manager.disconnect()
     
     def clear_all_tables(self):
         """Clear all HULA tables"""
@@ -243,9 +433,14 @@ def main():
                        help='Monitor duration (seconds, 0=no monitoring)')
     parser.add_argument('--clear', action='store_true',
                        help='Clear all tables before configuring')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                       help='Log every table entry')
     
     args = parser.parse_args()
     
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format='%(message)s')
+    
     controller = HULAController(args.switch, args.port)
     controller.probe_interval = args.probe_interval
     
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Raw L2 socket for bursting pre-built probe frames
+Uses sendmmsg(2) to send a whole burst in one syscall where available
+"""
+
+import os
+import errno
+import socket
+import logging
+import ctypes
+import ctypes.util
+from typing import List
+
+logger = logging.getLogger('nap.probe')
+
+# Capture/transmit all ethertypes (linux/if_ether.h)
+ETH_P_ALL = 0x0003
+
+# sendmmsg() errors worth retrying frame by frame within the same burst
+_TRANSIENT_ERRNOS = (errno.EINTR, errno.EAGAIN, errno.ENOBUFS)
+
+
+class _IOVec(ctypes.Structure):
+    _fields_ = [
+        ('iov_base', ctypes.c_void_p),
+        ('iov_len', ctypes.c_size_t),
+    ]
+
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ('msg_name', ctypes.c_void_p),
+        ('msg_namelen', ctypes.c_uint32),
+        ('msg_iov', ctypes.POINTER(_IOVec)),
+        ('msg_iovlen', ctypes.c_size_t),
+        ('msg_control', ctypes.c_void_p),
+        ('msg_controllen', ctypes.c_size_t),
+        ('msg_flags', ctypes.c_int),
+    ]
+
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [
+        ('msg_hdr', _MsgHdr),
+        ('msg_len', ctypes.c_uint),
+    ]
+
+
+def _load_sendmmsg():
+    """Return libc's sendmmsg, or None if the platform lacks it"""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        fn = libc.sendmmsg
+    except (OSError, AttributeError):
+        return None
+    fn.argtypes = [ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint, ctypes.c_int]
+    fn.restype = ctypes.c_int
+    return fn
+
+
+_sendmmsg = _load_sendmmsg()
+
+
+class ProbeSocket:
+    """AF_PACKET socket bound to one interface that sends frame bursts"""
+
+    def __init__(self, interface: str):
+        self.sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW,
+                                  socket.htons(ETH_P_ALL))
+        self.sock.bind((interface, 0))
+        self._frames = []
+        self._views = []
+        self._iovs = None
+        self._msgs = None
+
+    def load(self, frames: List[bytearray]):
+        """
+        Register the frames sent by each burst
+
+        The message vector points straight at the bytearrays, so later
+        in-place edits (e.g. timestamps) are picked up without rebuilding
+        it. The frames must not be resized while loaded.
+
+        Args:
+            frames: Pre-built Ethernet frames
+        """
+        self._frames = list(frames)
+        self._views = [(ctypes.c_char * len(f)).from_buffer(f) for f in self._frames]
+
+        if _sendmmsg is None or not self._frames:
+            self._msgs = None
+            return
+
+        n = len(self._frames)
+        iovs = (_IOVec * n)()
+        msgs = (_MMsgHdr * n)()
+        for i, view in enumerate(self._views):
+            iovs[i].iov_base = ctypes.addressof(view)
+            iovs[i].iov_len = len(view)
+            msgs[i].msg_hdr.msg_iov = ctypes.pointer(iovs[i])
+            msgs[i].msg_hdr.msg_iovlen = 1
+        self._msgs = msgs
+        self._iovs = iovs  # keep the iovec array alive alongside the messages
+
+    def send_burst(self) -> int:
+        """
+        Send every loaded frame
+
+        Returns:
+            Number of frames sent
+        
+        Raises:
+            OSError: If sendmmsg() fails with a non-transient error
+        """
+        frames = self._frames
+        sent = 0
+        if self._msgs is not None:
+            sent = _sendmmsg(self.sock.fileno(), self._msgs, len(frames), 0)
+            if sent < 0:
+                err = ctypes.get_errno()
+                sent = 0
+                if err == errno.ENOSYS:
+                    # libc has the symbol but the kernel does not: stop trying
+                    logger.warning("sendmmsg unsupported, sending probes one by one")
+                    self._msgs = None
+                elif err in _TRANSIENT_ERRNOS:
+                    logger.debug("sendmmsg failed (%s), sending burst one by one",
+                                 os.strerror(err))
+                else:
+                    raise OSError(err, f"sendmmsg: {os.strerror(err)}")
+
+        # Per-frame fallback for platforms without sendmmsg or a short send
+        send = self.sock.send
+        for frame in frames[sent:]:
+            send(frame)
+            sent += 1
+        return sent
+
+    def close(self):
+        """Release the frame views and close the socket"""
+        self._msgs = None
+        self._iovs = None
+        self._views = []
+        self._frames = []
+        self.sock.close()
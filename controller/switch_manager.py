@@ -6,7 +6,12 @@ Handles connection and common operations
 
 import sys
 import time
-from typing import List, Dict, Any
+import logging
+import threading
+import struct
+import functools
+import ipaddress
+from typing import List, Dict, Any, Iterable, Optional
 
 # Add runtime_CLI path for BMv2 Thrift bindings
 sys.path.append('/usr/local/lib/python3.8/site-packages')
@@ -22,15 +27,34 @@ except ImportError as e:
     print("Make sure BMv2 is installed with Python bindings")
     sys.exit(1)
 
+logger = logging.getLogger('nap.switch')
+
+# Pre-bound packers for the 2- and 4-byte fields used by table entries
+_U16 = struct.Struct('>H').pack
+_U32 = struct.Struct('>I').pack
+
+# Max requests in flight before draining replies; keeps both socket
+# buffers from filling up (which would deadlock client and switch)
+PIPELINE_DEPTH = 256
+
 
 class SwitchManager:
-    """Manages connection and operations on a BMv2 switch via Thrift"""
+    """
+    Manages connection and operations on a BMv2 switch via Thrift
+    
+    The buffered Thrift transport is not thread-safe, so every RPC holds
+    an RLock and threads sharing one manager are serialized. A thread
+    doing heavy work alongside another (e.g. register monitoring during
+    bulk configuration) should use its own connection from clone().
+    """
     
     def __init__(self, thrift_ip='localhost', thrift_port=9090):
         self.thrift_ip = thrift_ip
         self.thrift_port = thrift_port
         self.client = None
         self.transport = None
+        self._lock = threading.RLock()
+        self._tables_cache = None  # bm_get_tables() result for this connection
     
     def connect(self):
         """Establish Thrift connection to switch"""
@@ -41,18 +65,38 @@ class SwitchManager:
             
             self.client = Standard.Client(bprotocol)
             self.transport = transport
+            self._tables_cache = None
             transport.open()
-            print(f"✓ Connected to switch at {self.thrift_ip}:{self.thrift_port}")
+            logger.info("✓ Connected to switch at %s:%d", self.thrift_ip, self.thrift_port)
             return True
         except Exception as e:
-            print(f"✗ Failed to connect: {e}")
+            logger.error("✗ Failed to connect: %s", e)
             return False
     
     def disconnect(self):
         """Close Thrift connection"""
-        if self.transport:
+        with self._lock:
+            if not self.transport:
+                return
             self.transport.close()
-            print("✓ Disconnected from switch")
+            self.transport = None
+            self.client = None
+            self._tables_cache = None
+        logger.info("✓ Disconnected from switch")
+    
+    def clone(self) -> Optional['SwitchManager']:
+        """
+        Open an independent connection to the same switch
+        
+        Returns:
+            New connected SwitchManager, or None if the connection failed
+        """
+        other = SwitchManager(self.thrift_ip, self.thrift_port)
+        return other if other.connect() else None
+    
+    def is_connected(self) -> bool:
+        """Check whether a Thrift connection is open"""
+        return self.client is not None
     
     def add_table_entry(self, table_name: str, match_fields: List, 
                        action_name: str, action_params: List):
@@ -66,79 +110,154 @@ class SwitchManager:
             action_params: List of action parameter values
         """
         try:
-            self.client.bm_mt_add_entry(
-                0,  # cxt_id (context ID, usually 0)
-                table_name,
-                match_fields,
-                action_name,
-                action_params,
-                BmAddEntryOptions()
-            )
-            print(f"✓ Added entry to table '{table_name}'")
+            with self._lock:
+                self.client.bm_mt_add_entry(
+                    0,  # cxt_id (context ID, usually 0)
+                    table_name,
+                    match_fields,
+                    action_name,
+                    action_params,
+                    BmAddEntryOptions()
+                )
+            logger.debug("✓ Added entry to table '%s'", table_name)
             return True
         except Exception as e:
-            print(f"✗ Failed to add entry to '{table_name}': {e}")
+            logger.error("✗ Failed to add entry to '%s': %s", table_name, e)
             return False
     
+    def add_table_entries(self, table_name: str, entries: List) -> int:
+        """
+        Add many entries to a table with pipelined Thrift requests
+        
+        Requests are sent back to back without waiting for each reply,
+        then the replies are drained in order, so a batch costs roughly
+        one round trip per PIPELINE_DEPTH entries instead of one per entry.
+        
+        Args:
+            table_name: Name of the table
+            entries: List of (match_fields, action_name, action_params) tuples
+        
+        Returns:
+            Number of entries added successfully
+        """
+        if not entries:
+            return 0
+        
+        options = BmAddEntryOptions()
+        added = 0
+        
+        for start in range(0, len(entries), PIPELINE_DEPTH):
+            window = entries[start:start + PIPELINE_DEPTH]
+            
+            # Hold the lock for a whole window so no other RPC lands
+            # between its requests and replies
+            with self._lock:
+                sent = 0
+                try:
+                    for match_fields, action_name, action_params in window:
+                        self.client.send_bm_mt_add_entry(
+                            0, table_name, match_fields, action_name,
+                            action_params, options
+                        )
+                        sent += 1
+                except Exception as e:
+                    logger.error("✗ Failed to send entries to '%s': %s", table_name, e)
+                
+                for _ in range(sent):
+                    try:
+                        self.client.recv_bm_mt_add_entry()
+                        added += 1
+                    except Exception as e:
+                        logger.error("✗ Failed to add entry to '%s': %s", table_name, e)
+            
+            if sent < len(window):
+                break
+        
+        logger.info("✓ Added %d/%d entries to table '%s'", added, len(entries), table_name)
+        return added
+    
     def delete_table_entry(self, table_name: str, entry_handle: int):
         """Delete entry from table by handle"""
         try:
-            self.client.bm_mt_delete_entry(0, table_name, entry_handle)
-            print(f"✓ Deleted entry from table '{table_name}'")
+            with self._lock:
+                self.client.bm_mt_delete_entry(0, table_name, entry_handle)
+            logger.debug("✓ Deleted entry from table '%s'", table_name)
             return True
         except Exception as e:
-            print(f"✗ Failed to delete entry: {e}")
+            logger.error("✗ Failed to delete entry: %s", e)
             return False
     
     def clear_table(self, table_name: str):
         """Clear all entries from a table"""
         try:
-            self.client.bm_mt_clear_entries(0, table_name, False)
-            print(f"✓ Cleared table '{table_name}'")
+            with self._lock:
+                self.client.bm_mt_clear_entries(0, table_name, False)
+            logger.info("✓ Cleared table '%s'", table_name)
             return True
         except Exception as e:
-            print(f"✗ Failed to clear table: {e}")
+            logger.error("✗ Failed to clear table: %s", e)
             return False
     
-    def get_tables(self) -> List[str]:
-        """Get list of all tables in the switch"""
+    def get_tables(self, refresh: bool = False) -> List[str]:
+        """
+        Get list of all tables in the switch
+        
+        The list is fetched once per connection and cached; pass
+        refresh=True to fetch it again.
+        """
         try:
-            return self.client.bm_get_tables()
+            with self._lock:
+                if refresh or self._tables_cache is None:
+                    self._tables_cache = self.client.bm_get_tables()
+                return self._tables_cache
         except Exception as e:
-            print(f"✗ Failed to get tables: {e}")
+            logger.error("✗ Failed to get tables: %s", e)
             return []
     
     def set_default_action(self, table_name: str, action_name: str, 
                           action_params: List):
         """Set default action for a table"""
         try:
-            self.client.bm_mt_set_default_action(
-                0, table_name, action_name, action_params
-            )
-            print(f"✓ Set default action for '{table_name}' to '{action_name}'")
+            with self._lock:
+                self.client.bm_mt_set_default_action(
+                    0, table_name, action_name, action_params
+                )
+            logger.info("✓ Set default action for '%s' to '%s'", table_name, action_name)
             return True
         except Exception as e:
-            print(f"✗ Failed to set default action: {e}")
+            logger.error("✗ Failed to set default action: %s", e)
             return False
     
     def read_register(self, register_name: str, index: int) -> int:
         """Read value from register at index"""
         try:
-            return self.client.bm_register_read(0, register_name, index)
+            with self._lock:
+                return self.client.bm_register_read(0, register_name, index)
         except Exception as e:
-            print(f"✗ Failed to read register: {e}")
+            logger.error("✗ Failed to read register: %s", e)
             return -1
     
+    def read_register_all(self, register_name: str) -> List[int]:
+        """Read every cell of a register array in one call"""
+        try:
+            with self._lock:
+                return self.client.bm_register_read_all(0, register_name)
+        except Exception as e:
+            logger.error("✗ Failed to read register: %s", e)
+            return []
+    
     def write_register(self, register_name: str, index: int, value: int):
         """Write value to register at index"""
         try:
-            self.client.bm_register_write(0, register_name, index, value)
+            with self._lock:
+                self.client.bm_register_write(0, register_name, index, value)
             return True
         except Exception as e:
-            print(f"✗ Failed to write register: {e}")
+            logger.error("✗ Failed to write register: %s", e)
             return False
 
 
+@functools.lru_cache(maxsize=4096)
 def ip_to_int(ip_str: str) -> int:
     """Convert IP string to integer"""
     parts = ip_str.split('.')
@@ -146,11 +265,45 @@ def ip_to_int(ip_str: str) -> int:
            (int(parts[2]) << 8) + int(parts[3])
 
 
+def ip_batch_to_int(ip_strs: Iterable[str]) -> List[int]:
+    """
+    Convert many IP strings to integers in one pass
+    
+    Each address is parsed with the same strict grammar as the LPM keys
+    built from ipaddress elsewhere (exactly four decimal octets, no
+    inet_aton short or octal forms), and the concatenated buffer is
+    unpacked with a single struct call.
+    
+    Args:
+        ip_strs: Dotted-quad IPv4 addresses
+    
+    Returns:
+        List of addresses as integers, in input order
+    
+    Raises:
+        ValueError: If an address is not a strict dotted quad
+    """
+    packed = b''.join(ipaddress.IPv4Address(ip).packed for ip in ip_strs)
+    return list(struct.unpack(f'>{len(packed) // 4}I', packed))
+
+
+@functools.lru_cache(maxsize=4096)
 def mac_to_bytes(mac_str: str) -> bytes:
     """Convert MAC string to bytes"""
     return bytes.fromhex(mac_str.replace(':', ''))
 
 
+@functools.lru_cache(maxsize=4096)
 def int_to_bytes(num: int, num_bytes: int) -> bytes:
     """Convert integer to bytes with specific length"""
+    if num_bytes == 2:
+        return _U16(num)
+    if num_bytes == 4:
+        return _U32(num)
     return num.to_bytes(num_bytes, byteorder='big')
+
+
+# Warm the cache with the 2-byte egress port encodings
+for _port in range(1, 65):
+    int_to_bytes(_port, 2)
+del _port
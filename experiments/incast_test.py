@@ -8,16 +8,27 @@ import sys
 import time
 import argparse
 import json
+import numpy as np
 from datetime import datetime
-from traffic_gen import TrafficGenerator
+from traffic_gen import (TrafficGenerator, new_shared_generator, sender_ips,
+                         MIB, BPS_TO_MBPS, write_json)
+
+# Per-flow fields pulled out of the iperf3 results in one pass
+_FLOW_DTYPE = np.dtype([
+    ('bytes', np.int64),
+    ('retransmits', np.int64),
+    ('bps', np.float64),
+    ('ok', np.bool_),
+])
 
 
 class IncastTest:
     """Incast traffic test scenario"""
     
-    def __init__(self, config_file: str):
+    def __init__(self, config_file: str, traffic_gen: TrafficGenerator = None):
         self.config = self.load_config(config_file)
-        self.traffic_gen = TrafficGenerator()
+        # Default to a generator sharing the process-wide servers and log
+        self.traffic_gen = traffic_gen if traffic_gen is not None else new_shared_generator()
         self.results = {
             'test_type': 'incast',
             'timestamp': datetime.now().isoformat(),
@@ -38,12 +49,12 @@ class IncastTest:
         bandwidth = incast_config['bandwidth_per_flow']
         
         print("\n" + "=" * 60)
-        print("INCAST TEST: {} senders \u2192 1 receiver".format(num_senders))
-        print("Duration: {}s, Per-flow BW: {}".format(duration, bandwidth))
+        print(f"INCAST TEST: {num_senders} senders → 1 receiver")
+        print(f"Duration: {duration}s, Per-flow BW: {bandwidth}")
         print("=" * 60 + "\n")
         
         # Generate sender and receiver IPs
-        senders = ["10.0.1.{}".format(i + 1) for i in range(num_senders)]
+        senders = sender_ips(num_senders)
         receiver = "10.0.2.1"
         
         # Run incast pattern
@@ -60,7 +71,7 @@ class IncastTest:
         
         # Save results
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        results_file = "incast_results_{}.json".format(timestamp)
+        results_file = f"incast_results_{timestamp}.json"
         self.save_results(results_file)
     
     def calculate_metrics(self):
@@ -71,15 +82,21 @@ class IncastTest:
             print("No flow results to analyze")
             return
         
-        total_bytes = sum(f.get('bytes_transferred', 0) for f in flows)
-        total_retransmits = sum(f.get('retransmits', 0) for f in flows)
-        avg_throughput = sum(f.get('bits_per_second', 0) for f in flows) / float(len(flows))
+        arr = np.fromiter(
+            ((f.get('bytes_transferred', 0), f.get('retransmits', 0),
+              f.get('bits_per_second', 0), 'error' not in f) for f in flows),
+            dtype=_FLOW_DTYPE, count=len(flows)
+        )
+        
+        total_bytes = int(arr['bytes'].sum())
+        total_retransmits = int(arr['retransmits'].sum())
+        avg_throughput = float(arr['bps'].mean())
         
         packet_loss_rate = 0.0
         denom = max(total_bytes / 1500.0, 1.0)
         packet_loss_rate = total_retransmits / denom
         
-        num_successful = len([f for f in flows if 'error' not in f])
+        num_successful = int(np.count_nonzero(arr['ok']))
         
         metrics = {
             'total_bytes_transferred': total_bytes,
@@ -91,22 +108,24 @@ class IncastTest:
         
         self.results['metrics'] = metrics
         
-        print("\n" + "=" * 60)
-        print("TEST RESULTS:")
-        print("=" * 60)
-        print("Total bytes transferred: {:.2f} MB".format(total_bytes / (1024.0 ** 2)))
-        print("Total retransmits: {}".format(total_retransmits))
-        print("Average throughput: {:.2f} Mbps".format(avg_throughput / (1024.0 ** 2)))
-        print("Packet loss rate: {:.4f}".format(packet_loss_rate))
-        print("Successful flows: {}/{}".format(num_successful, len(flows)))
-        print("=" * 60 + "\n")
+        rule = "=" * 60
+        sys.stdout.write(
+            f"\n{rule}\n"
+            "TEST RESULTS:\n"
+            f"{rule}\n"
+            f"Total bytes transferred: {total_bytes / MIB:.2f} MB\n"
+            f"Total retransmits: {total_retransmits}\n"
+            f"Average throughput: {avg_throughput * BPS_TO_MBPS:.2f} Mbps\n"
+            f"Packet loss rate: {packet_loss_rate:.4f}\n"
+            f"Successful flows: {num_successful}/{len(flows)}\n"
+            f"{rule}\n\n"
+        )
     
     def save_results(self, filename: str):
         """Save test results"""
-        filepath = "../results/{}".format(filename)
-        with open(filepath, 'w') as f:
-            json.dump(self.results, f, indent=2)
-        print("\u2713 Results saved to {}".format(filepath))
+        filepath = f"../results/{filename}"
+        write_json(filepath, self.results)
+        print(f"✓ Results saved to {filepath}")
 
 
 def main():
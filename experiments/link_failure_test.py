@@ -8,17 +8,27 @@ import sys
 import time
 import argparse
 import json
+import shutil
 import subprocess
 from datetime import datetime
-from traffic_gen import TrafficGenerator
+from traffic_gen import (TrafficGenerator, new_shared_generator, BPS_TO_MBPS,
+                         write_json, JsonlCheckpoint)
+
+# Fixed argv prefix for port state changes; only switch/port/state vary
+_MOD_PORT = (shutil.which('ovs-ofctl') or 'ovs-ofctl', 'mod-port')
 
 
 class LinkFailureTest:
     """Link failure and recovery test"""
     
-    def __init__(self, config_file: str):
+    __slots__ = ('config', 'traffic_gen', 'run_id', '_checkpoint', 'results')
+    
+    def __init__(self, config_file: str, traffic_gen: TrafficGenerator = None):
         self.config = self.load_config(config_file)
-        self.traffic_gen = TrafficGenerator()
+        # Default to a generator sharing the process-wide servers and log
+        self.traffic_gen = traffic_gen if traffic_gen is not None else new_shared_generator()
+        self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._checkpoint = JsonlCheckpoint('link_failure', self.run_id)
         self.results = {
             'test_type': 'link_failure',
             'timestamp': datetime.now().isoformat(),
@@ -30,33 +40,51 @@ class LinkFailureTest:
         with open(config_file, 'r') as f:
             return json.load(f)
     
-    def bring_link_down(self, switch: str, port: int):
+    def _record_phase(self, entry: dict):
+        """Add an event or phase result to the results and the checkpoint"""
+        self.results['phases'].append(entry)
+        self._checkpoint.write(entry)
+    
+    def _set_link_state(self, switch: str, port: int, state: str) -> bool:
         """
-        Bring a switch link down
+        Set a switch port administratively up or down and record the event
         
         Args:
             switch: Switch name (e.g., 's1')
             port: Port number
-        """
-        print(f"\n✗ Bringing link down: {switch} port {port}")
+            state: 'up' or 'down'
         
-        # In Mininet: net.configLinkStatus(switch, other_switch, 'down')
+        Returns:
+            True if ovs-ofctl succeeded
+        """
+        # In Mininet: net.configLinkStatus(switch, other_switch, state)
         # For simulation, we'll use a placeholder command
-        cmd = f"ovs-ofctl mod-port {switch} {port} down"
-        
         try:
-            subprocess.run(cmd.split(), check=True, capture_output=True)
-            self.results['phases'].append({
+            subprocess.run([*_MOD_PORT, switch, str(port), state],
+                           check=True, capture_output=True, close_fds=False)
+            self._record_phase({
                 'timestamp': time.time(),
-                'event': 'link_down',
+                'timestamp_ns': time.monotonic_ns(),
+                'event': f'link_{state}',
                 'switch': switch,
                 'port': port
             })
             return True
         except subprocess.CalledProcessError as e:
-            print(f"Failed to bring link down: {e}")
+            print(f"Failed to bring link {state}: {e}")
             return False
     
+    def bring_link_down(self, switch: str, port: int):
+        """
+        Bring a switch link down
+        
+        Args:
+            switch: Switch name (e.g., 's1')
+            port: Port number
+        """
+        print(f"\n✗ Bringing link down: {switch} port {port}")
+        return self._set_link_state(switch, port, 'down')
+    
     def bring_link_up(self, switch: str, port: int):
         """
         Bring a switch link up
@@ -66,21 +94,7 @@ class LinkFailureTest:
             port: Port number
         """
         print(f"\n✓ Bringing link up: {switch} port {port}")
-        
-        cmd = f"ovs-ofctl mod-port {switch} {port} up"
-        
-        try:
-            subprocess.run(cmd.split(), check=True, capture_output=True)
-            self.results['phases'].append({
-                'timestamp': time.time(),
-                'event': 'link_up',
-                'switch': switch,
-                'port': port
-            })
-            return True
-        except subprocess.CalledProcessError as e:
-            print(f"Failed to bring link up: {e}")
-            return False
+        return self._set_link_state(switch, port, 'up')
     
     def measure_flow(self, src: str, dst: str, duration: int, 
                     phase_name: str) -> dict:
@@ -104,11 +118,18 @@ class LinkFailureTest:
         
         result['phase'] = phase_name
         result['measurement_time'] = time.time()
+        result['measurement_time_ns'] = time.monotonic_ns()
         
         return result
     
     def run_test(self):
         """Execute link failure test"""
+        # The checkpoint is closed even if a phase raises partway through
+        with self._checkpoint:
+            self._run()
+    
+    def _run(self):
+        """Run every phase, then compute metrics and save the results"""
         print(f"\n{'='*60}")
         print(f"LINK FAILURE TEST")
         print(f"{'='*60}\n")
@@ -125,7 +146,7 @@ class LinkFailureTest:
         # Phase 1: Normal operation (baseline)
         print("\n[Phase 1: Baseline - Normal Operation]")
         phase1_result = self.measure_flow(src, dst, phase_duration, "baseline")
-        self.results['phases'].append({
+        self._record_phase({
             'phase': 'baseline',
             'flow_result': phase1_result
         })
@@ -138,7 +159,7 @@ class LinkFailureTest:
         time.sleep(2)  # Wait for failure detection
         
         phase2_result = self.measure_flow(src, dst, phase_duration, "failure")
-        self.results['phases'].append({
+        self._record_phase({
             'phase': 'failure',
             'flow_result': phase2_result
         })
@@ -151,7 +172,7 @@ class LinkFailureTest:
         time.sleep(2)  # Wait for reconvergence
         
         phase3_result = self.measure_flow(src, dst, phase_duration, "recovery")
-        self.results['phases'].append({
+        self._record_phase({
             'phase': 'recovery',
             'flow_result': phase3_result
         })
@@ -160,8 +181,7 @@ class LinkFailureTest:
         self.calculate_metrics()
         
         # Save results
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        results_file = f"link_failure_results_{timestamp}.json"
+        results_file = f"link_failure_results_{self.run_id}.json"
         self.save_results(results_file)
     
     def calculate_metrics(self):
@@ -181,9 +201,9 @@ class LinkFailureTest:
         recovery_throughput = recovery.get('bits_per_second', 0)
         
         metrics = {
-            'baseline_throughput_mbps': baseline_throughput / (1024**2),
-            'failure_throughput_mbps': failure_throughput / (1024**2),
-            'recovery_throughput_mbps': recovery_throughput / (1024**2),
+            'baseline_throughput_mbps': baseline_throughput * BPS_TO_MBPS,
+            'failure_throughput_mbps': failure_throughput * BPS_TO_MBPS,
+            'recovery_throughput_mbps': recovery_throughput * BPS_TO_MBPS,
             'throughput_degradation_pct': (1 - failure_throughput / max(baseline_throughput, 1)) * 100,
             'recovery_efficiency_pct': (recovery_throughput / max(baseline_throughput, 1)) * 100,
             'baseline_retransmits': baseline.get('retransmits', 0),
@@ -209,8 +229,7 @@ class LinkFailureTest:
     def save_results(self, filename: str):
         """Save test results"""
         filepath = f"../results/{filename}"
-        with open(filepath, 'w') as f:
-            json.dump(self.results, f, indent=2)
+        write_json(filepath, self.results)
         print(f"✓ Results saved to {filepath}")
 
 
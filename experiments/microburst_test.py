@@ -9,16 +9,30 @@ import time
 import argparse
 import json
 import subprocess
+import numpy as np
 from datetime import datetime
-from traffic_gen import TrafficGenerator
+from traffic_gen import (TrafficGenerator, new_shared_generator, BASE_PORT,
+                         sender_ips, MIB, write_json, JsonlCheckpoint)
+
+# Per-burst fields pulled out of the burst summaries in one pass
+_BURST_DTYPE = np.dtype([
+    ('size_mb', np.float64),
+    ('retransmits', np.int64),
+    ('duration', np.float64),
+])
 
 
 class MicroburstTest:
     """Microburst traffic test scenario"""
     
-    def __init__(self, config_file: str):
+    __slots__ = ('config', 'traffic_gen', 'run_id', '_checkpoint', 'results')
+    
+    def __init__(self, config_file: str, traffic_gen: TrafficGenerator = None):
         self.config = self.load_config(config_file)
-        self.traffic_gen = TrafficGenerator()
+        # Default to a generator sharing the process-wide servers and log
+        self.traffic_gen = traffic_gen if traffic_gen is not None else new_shared_generator()
+        self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._checkpoint = JsonlCheckpoint('microburst', self.run_id)
         self.results = {
             'test_type': 'microburst',
             'timestamp': datetime.now().isoformat(),
@@ -46,28 +60,30 @@ class MicroburstTest:
         """
         print(f"\n→ Generating {burst_size_mb}MB burst from {len(senders)} senders")
         
+        # Wall clock for the record, monotonic clock for the interval
         burst_start = time.time()
-        burst_results = []
+        start_ns = time.monotonic_ns()
         
         # Calculate duration to send burst_size_mb at burst_rate
         # For simplicity, use fixed short duration
         duration = max(1, int(burst_size_mb / 100))  # Rough estimate
         
-        for sender in senders:
-            result = self.traffic_gen.run_iperf_client(
-                sender, receiver, 
-                duration=duration,
-                bandwidth=burst_rate
-            )
-            burst_results.append(result)
+        # All senders fire at once, each against its own receiver port
+        burst_results = self.traffic_gen.run_iperf_clients(
+            [(sender, receiver, BASE_PORT + i) for i, sender in enumerate(senders)],
+            duration=duration,
+            bandwidth=burst_rate
+        )
         
-        burst_end = time.time()
+        duration_ns = time.monotonic_ns() - start_ns
+        burst_duration = duration_ns / 1e9
         
         burst_summary = {
             'burst_id': len(self.results['bursts']) + 1,
             'start_time': burst_start,
-            'end_time': burst_end,
-            'duration': burst_end - burst_start,
+            'end_time': burst_start + burst_duration,
+            'duration': burst_duration,
+            'duration_ns': duration_ns,
             'num_senders': len(senders),
             'target_size_mb': burst_size_mb,
             'flows': burst_results
@@ -75,7 +91,7 @@ class MicroburstTest:
         
         # Calculate actual bytes sent
         total_bytes = sum(f.get('bytes_transferred', 0) for f in burst_results)
-        burst_summary['actual_size_mb'] = total_bytes / (1024**2)
+        burst_summary['actual_size_mb'] = total_bytes / MIB
         burst_summary['total_retransmits'] = sum(
             f.get('retransmits', 0) for f in burst_results
         )
@@ -84,6 +100,12 @@ class MicroburstTest:
     
     def run_test(self):
         """Execute microburst test"""
+        # The checkpoint is closed even if a burst raises partway through
+        with self._checkpoint:
+            self._run()
+    
+    def _run(self):
+        """Run every burst, then compute metrics and save the results"""
         microburst_config = self.config['scenarios']['microburst']
         
         burst_size_mb = microburst_config['burst_size_mb']
@@ -98,12 +120,13 @@ class MicroburstTest:
         print(f"{'='*60}\n")
         
         # Generate sender and receiver IPs
-        senders = [f"10.0.1.{i+1}" for i in range(num_senders)]
+        senders = sender_ips(num_senders)
         receiver = "10.0.2.1"
         
-        # Start receiver
-        self.traffic_gen.start_iperf_server(receiver)
-        time.sleep(2)
+        # Start one receiver server per sender
+        self.traffic_gen.start_iperf_servers(
+            ((receiver, BASE_PORT + i) for i in range(num_senders)), settle=2
+        )
         
         # Generate bursts with inter-burst intervals
         for burst_num in range(num_bursts):
@@ -113,6 +136,7 @@ class MicroburstTest:
                 senders, receiver, burst_size_mb
             )
             self.results['bursts'].append(burst_result)
+            self._checkpoint.write(burst_result)
             
             # Wait before next burst
             if burst_num < num_bursts - 1:
@@ -124,8 +148,7 @@ class MicroburstTest:
         self.calculate_metrics()
         
         # Save results
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        results_file = f"microburst_results_{timestamp}.json"
+        results_file = f"microburst_results_{self.run_id}.json"
         self.save_results(results_file)
     
     def calculate_metrics(self):
@@ -137,15 +160,20 @@ class MicroburstTest:
             return
         
         total_bursts = len(bursts)
-        total_mb_sent = sum(b['actual_size_mb'] for b in bursts)
-        total_retransmits = sum(b['total_retransmits'] for b in bursts)
-        avg_burst_duration = sum(b['duration'] for b in bursts) / total_bursts
+        arr = np.fromiter(
+            ((b['actual_size_mb'], b['total_retransmits'], b['duration']) for b in bursts),
+            dtype=_BURST_DTYPE, count=total_bursts
+        )
+        
+        burst_sizes = arr['size_mb']
+        total_mb_sent = float(burst_sizes.sum())
+        total_retransmits = int(arr['retransmits'].sum())
+        avg_burst_duration = float(arr['duration'].mean())
         
         # Calculate per-burst statistics
-        burst_sizes = [b['actual_size_mb'] for b in bursts]
-        min_burst = min(burst_sizes)
-        max_burst = max(burst_sizes)
-        avg_burst = sum(burst_sizes) / len(burst_sizes)
+        min_burst = float(burst_sizes.min())
+        max_burst = float(burst_sizes.max())
+        avg_burst = float(burst_sizes.mean())
         
         metrics = {
             'total_bursts': total_bursts,
@@ -155,7 +183,7 @@ class MicroburstTest:
             'min_burst_size_mb': min_burst,
             'max_burst_size_mb': max_burst,
             'avg_burst_size_mb': avg_burst,
-            'burst_size_variance': sum((x - avg_burst)**2 for x in burst_sizes) / len(burst_sizes)
+            'burst_size_variance': float(burst_sizes.var())
         }
         
         self.results['metrics'] = metrics
@@ -175,8 +203,7 @@ class MicroburstTest:
     def save_results(self, filename: str):
         """Save test results"""
         filepath = f"../results/{filename}"
-        with open(filepath, 'w') as f:
-            json.dump(self.results, f, indent=2)
+        write_json(filepath, self.results)
         print(f"✓ Results saved to {filepath}")
 
 
@@ -4,51 +4,388 @@ Advanced traffic generator with multiple patterns and logging
 """
 
 import subprocess
+import shutil
+import atexit
 import time
-import json
+import random
 import os
-from typing import List, Dict
+import tempfile
+import ijson
+import orjson
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from typing import List, Dict, Tuple
 from datetime import datetime
 
+# iperf3 servers handle one test at a time, so concurrent flows each get
+# their own server port counting up from here
+BASE_PORT = 5201
+
+# Unit conversions: iperf3 reports decimal bits per second, while data
+# sizes are reported in binary mebibytes
+MIB = 1 << 20
+BPS_TO_MBPS = 1e-6
+
+# Sender addresses 10.0.1.1 - 10.0.1.254, built once and sliced per test
+SENDER_IPS = tuple(f"10.0.1.{i}" for i in range(1, 255))
+
+
+def sender_ips(num_senders: int) -> List[str]:
+    """
+    First num_senders sender addresses
+    
+    Raises:
+        ValueError: If more senders are requested than SENDER_IPS holds
+    """
+    if num_senders > len(SENDER_IPS):
+        raise ValueError(f"num_senders={num_senders} exceeds the "
+                         f"{len(SENDER_IPS)} available sender addresses")
+    return list(SENDER_IPS[:num_senders])
+
+# Absolute path to iperf3. With a path containing a directory, no cwd and
+# close_fds=False, subprocess launches it via posix_spawn() instead of
+# fork()+exec(); our own descriptors are non-inheritable anyway (PEP 446)
+IPERF3 = shutil.which('iperf3') or 'iperf3'
+
+
+def _spawn(args: List[str], **kwargs) -> subprocess.Popen:
+    """Launch a pre-split command line on the posix_spawn fast path"""
+    return subprocess.Popen(args, close_fds=False, **kwargs)
+
+
+# iperf3 writes its JSON report here via --logfile instead of to a pipe;
+# /dev/shm keeps the round trip in memory where it exists
+REPORT_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+
+def _read_report(fd: int) -> bytes:
+    """Read a whole iperf3 report file with a single pread()"""
+    return os.pread(fd, os.fstat(fd).st_size, 0)
+
+
+# Results files are indented for readability; NumPy values are accepted as-is
+JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE
+
+
+def write_json(path: str, obj):
+    """
+    Serialize obj with orjson and write it to path unbuffered
+    
+    The document is encoded once into a single bytes object and handed
+    straight to os.write(), bypassing Python's file buffering.
+    
+    Args:
+        path: Output file path
+        obj: JSON-serializable object
+    """
+    data = memoryview(orjson.dumps(obj, option=JSON_OPTIONS))
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        # os.write may be short for large documents
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+
+
+# Fields kept from an iperf3 report's end.sum_sent object
+SUM_SENT_KEYS = ('bytes', 'bits_per_second', 'retransmits')
+
+
+def _parse_sum_sent(report: bytes) -> Dict:
+    """
+    Extract end.sum_sent from an iperf3 JSON report without building the rest
+    
+    The per-interval samples ahead of 'end' are scanned by the C parser
+    but never turned into Python objects.
+    
+    Args:
+        report: Raw iperf3 -J output
+    
+    Returns:
+        Dictionary with the SUM_SENT_KEYS present in the report
+    """
+    sum_sent = {}
+    for key, value in ijson.kvitems(report, 'end.sum_sent', use_float=True):
+        if key in SUM_SENT_KEYS:
+            sum_sent[key] = value
+            if len(sum_sent) == len(SUM_SENT_KEYS):
+                break
+    return sum_sent
+
+
+# Columns of a successful flow summary: numeric ones are held in typed
+# arrays (array typecode), the rest in plain lists (None)
+RESULT_COLUMNS = (
+    ('src', None),
+    ('dst', None),
+    ('duration', None),  # kept as given; callers may pass int or float
+    ('bandwidth_requested', None),
+    ('bytes_transferred', 'q'),
+    ('bits_per_second', 'd'),
+    ('retransmits', 'q'),
+    ('timestamp', None),
+)
+
+
+def _empty_columns() -> Dict:
+    """Fresh, empty result columns laid out per RESULT_COLUMNS"""
+    return {name: array(code) if code else [] for name, code in RESULT_COLUMNS}
+
 
 class TrafficGenerator:
     """Generate various traffic patterns for testing"""
     
-    def __init__(self, log_dir='../logs'):
+    __slots__ = ('log_dir', '_rng', '_cols', '_rows', '_server_procs', '_log_stamp', '_log_fh')
+    
+    def __init__(self, log_dir='../logs', seed=None):
         self.log_dir = log_dir
+        self._rng = random.Random(seed)  # seed for reproducible random patterns
         os.makedirs(log_dir, exist_ok=True)
-        self.results = []
+        # Flow summaries are stored column-wise, one entry per flow
+        self._cols = _empty_columns()
+        self._rows = None  # cached row view of _cols, rebuilt after new results
+        self._server_procs: Dict[Tuple[str, int], subprocess.Popen] = {}
+        self._log_stamp = (None, '')  # (epoch second, formatted timestamp)
+        
+        # Kept open for the generator's lifetime; lines are buffered rather
+        # than reopening the file for every message
+        self._log_fh = open(os.path.join(log_dir, 'traffic_gen.log'), 'a',
+                            buffering=1 << 16)
+        atexit.register(self._log_fh.close)
+        # Registered after the log close so it runs first and can still log
+        atexit.register(self.stop_iperf_servers)
+    
+    def share(self, seed=None) -> 'TrafficGenerator':
+        """
+        Create a generator that reuses this one's iperf3 servers and log
+        
+        The new generator has its own results and RNG, so tests sharing
+        servers never see each other's flows.
+        
+        Args:
+            seed: Seed for the new generator's random patterns
+        
+        Returns:
+            TrafficGenerator sharing the server cache and log handle
+        """
+        other = TrafficGenerator.__new__(TrafficGenerator)
+        other.log_dir = self.log_dir
+        other._rng = random.Random(seed)
+        other._cols = _empty_columns()
+        other._rows = None
+        other._server_procs = self._server_procs  # same dict, not a copy
+        other._log_stamp = (None, '')
+        other._log_fh = self._log_fh
+        return other
     
     def _log(self, message: str):
         """Log message with timestamp"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # Reformat the timestamp only when the second changes
+        sec = int(time.time())
+        cached_sec, timestamp = self._log_stamp
+        if sec != cached_sec:
+            timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sec))
+            self._log_stamp = (sec, timestamp)
         log_msg = f"[{timestamp}] {message}"
         print(log_msg)
-        
-        log_file = os.path.join(self.log_dir, 'traffic_gen.log')
-        with open(log_file, 'a') as f:
-            f.write(log_msg + '\n')
+        self._log_fh.write(log_msg + '\n')
     
-    def start_iperf_server(self, host: str, port: int = 5201):
+    def start_iperf_server(self, host: str, port: int = 5201, wait: bool = True):
         """
         Start iperf3 server on host
         
+        Servers are long-lived, so a (host, port) whose cached server is
+        still running is returned as-is; one that has exited is restarted.
+        The server runs in the foreground (no -D) so the cached process is
+        the server itself and its liveness can be polled.
+        
         Args:
             host: Host name/IP
             port: iperf3 port (default 5201)
+            wait: Sleep briefly after starting a new server
         
         Returns:
             subprocess.Popen object
         """
-        cmd = f"iperf3 -s -p {port} -D"
+        key = (host, port)
+        proc = self._server_procs.get(key)
+        if proc is not None:
+            if proc.poll() is None:
+                return proc
+            self._log(f"iperf3 server on {host}:{port} exited "
+                      f"({proc.returncode}), restarting")
+        
+        args = [IPERF3, '-s', '-p', str(port)]
         self._log(f"Starting iperf3 server on {host}:{port}")
         
         # In real Mininet, you would use net.get(host).cmd()
         # For now, using subprocess as placeholder
-        proc = subprocess.Popen(cmd.split(), stdout=subprocess.PIPE)
-        time.sleep(1)  # Wait for server to start
+        proc = _spawn(args, stdout=subprocess.DEVNULL)
+        self._server_procs[key] = proc
+        if wait:
+            time.sleep(1)  # Wait for server to start
         return proc
     
+    def start_iperf_servers(self, endpoints, settle: float = 1.0):
+        """
+        Start iperf3 servers for many (host, port) endpoints
+        
+        New servers are launched back to back and the caller waits once
+        for all of them, rather than once per server.
+        
+        Args:
+            endpoints: Iterable of (host, port) tuples
+            settle: Seconds to wait if any server was newly started
+        """
+        started = False
+        for host, port in endpoints:
+            proc = self._server_procs.get((host, port))
+            if proc is None or proc.poll() is not None:
+                self.start_iperf_server(host, port, wait=False)
+                started = True
+        
+        if started:
+            time.sleep(settle)
+    
+    def stop_iperf_servers(self, timeout: float = 2.0):
+        """
+        Stop every iperf3 server this generator started
+        
+        Args:
+            timeout: Seconds to wait for each server after SIGTERM before killing it
+        """
+        # Cleared in place: generators from share() hold the same dict
+        procs = dict(self._server_procs)
+        self._server_procs.clear()
+        for proc in procs.values():
+            if proc.poll() is None:
+                proc.terminate()
+        for proc in procs.values():
+            try:
+                proc.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+        if procs:
+            self._log(f"Stopped {len(procs)} iperf3 server(s)")
+    
+    def _spawn_iperf_client(self, src: str, dst: str, dst_port: int = 5201,
+                            duration: int = 10, bandwidth: str = '10M',
+                            protocol: str = 'tcp') -> Tuple[subprocess.Popen, int, str]:
+        """
+        Start an iperf3 client without waiting for it to finish
+        
+        Returns:
+            Tuple of (process, report fd, report path)
+        """
+        # Only the end summary is used, so per-second intervals are turned off
+        # and the report goes to a tmpfs file rather than a stdout pipe
+        fd, report_path = tempfile.mkstemp(prefix='iperf_', suffix='.json', dir=REPORT_DIR)
+        args = [IPERF3, '-c', dst, '-p', str(dst_port), '-t', str(duration),
+                '-b', bandwidth, '-J', '-i', '0', '--logfile', report_path]
+        if protocol == 'udp':
+            args.append('-u')
+        
+        self._log(f"Running iperf3: {src} → {dst} ({bandwidth}, {duration}s)")
+        
+        try:
+            proc = _spawn(
+                args,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE
+            )
+        except OSError:
+            os.close(fd)
+            os.unlink(report_path)
+            raise
+        return proc, fd, report_path
+    
+    def _collect_iperf_result(self, proc: subprocess.Popen, fd: int, report_path: str,
+                              src: str, dst: str, duration: int, bandwidth: str) -> Dict:
+        """Wait for a spawned iperf3 client and summarize its JSON report"""
+        try:
+            try:
+                _, stderr = proc.communicate(timeout=duration + 10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.communicate()
+                self._log(f"iperf3 timeout from {src} to {dst}")
+                return {'error': 'timeout'}
+            
+            report = _read_report(fd)
+        finally:
+            os.close(fd)
+            os.unlink(report_path)
+        
+        if proc.returncode != 0:
+            # With -J, iperf3 reports its errors inside the JSON report
+            err = stderr.decode(errors='replace') or report.decode(errors='replace')
+            self._log(f"iperf3 failed: {err}")
+            return {'error': err}
+        
+        # Only end.sum_sent is materialized from the raw report bytes
+        try:
+            sum_sent = _parse_sum_sent(report)
+        except ijson.JSONError as e:
+            self._log(f"Failed to parse iperf3 output: {e}")
+            return {'error': 'parse_error'}
+        
+        if 'bytes' not in sum_sent or 'bits_per_second' not in sum_sent:
+            self._log("Failed to parse iperf3 output: no end.sum_sent summary")
+            return {'error': 'parse_error'}
+        
+        summary = {
+            'src': src,
+            'dst': dst,
+            'duration': duration,
+            'bandwidth_requested': bandwidth,
+            'bytes_transferred': sum_sent['bytes'],
+            'bits_per_second': sum_sent['bits_per_second'],
+            'retransmits': sum_sent.get('retransmits', 0),
+            'timestamp': datetime.now().isoformat()
+        }
+        return summary
+    
+    def _record(self, summary: Dict):
+        """Append a flow summary to the result columns, skipping errors"""
+        if 'error' in summary:
+            return
+        
+        # Convert the whole row before touching any column, so a bad value
+        # drops just this flow instead of leaving the columns misaligned
+        try:
+            row = [
+                (int(summary[name]) if code == 'q' else float(summary[name]))
+                if code else summary[name]
+                for name, code in RESULT_COLUMNS
+            ]
+        except (KeyError, TypeError, ValueError) as e:
+            self._log(f"Not recording flow {summary.get('src')} → "
+                      f"{summary.get('dst')}: bad field ({e})")
+            return
+        
+        cols = self._cols
+        for (name, _), value in zip(RESULT_COLUMNS, row):
+            cols[name].append(value)
+        self._rows = None
+    
+    @property
+    def results(self) -> Tuple[Dict, ...]:
+        """
+        Successful flow summaries, one dictionary per flow
+        
+        A read-only view: the rows are rebuilt from the columns (and
+        cached) only after new results have been recorded, so edits to
+        them are not kept.
+        """
+        if self._rows is None:
+            names = [name for name, _ in RESULT_COLUMNS]
+            self._rows = tuple(dict(zip(names, row))
+                               for row in zip(*(self._cols[n] for n in names)))
+        return self._rows
+    
     def run_iperf_client(self, src: str, dst: str, dst_port: int = 5201,
                         duration: int = 10, bandwidth: str = '10M',
                         protocol: str = 'tcp') -> Dict:
@@ -66,44 +403,64 @@ class TrafficGenerator:
         Returns:
             Dictionary with results
         """
-        cmd = f"iperf3 -c {dst} -p {dst_port} -t {duration} -b {bandwidth} -J"
-        if protocol == 'udp':
-            cmd += " -u"
+        proc, fd, report_path = self._spawn_iperf_client(
+            src, dst, dst_port, duration, bandwidth, protocol
+        )
+        result = self._collect_iperf_result(proc, fd, report_path, src, dst,
+                                            duration, bandwidth)
+        self._record(result)
+        return result
+    
+    def run_iperf_clients(self, flows: List[Tuple[str, str, int]],
+                          duration: int = 10, bandwidth: str = '10M',
+                          protocol: str = 'tcp') -> List[Dict]:
+        """
+        Run several iperf3 clients at the same time
         
-        self._log(f"Running iperf3: {src} → {dst} ({bandwidth}, {duration}s)")
+        All clients are spawned back to back before any is waited on, so
+        the flows overlap instead of running one after another.
+        
+        Args:
+            flows: List of (src, dst, dst_port) tuples
+            duration: Test duration in seconds
+            bandwidth: Per-flow target bandwidth
+            protocol: 'tcp' or 'udp'
+        
+        Returns:
+            List of result dictionaries, in the order of flows
+        """
+        if not flows:
+            return []
         
+        spawned = []
         try:
-            result = subprocess.run(
-                cmd.split(),
-                capture_output=True,
-                text=True,
-                timeout=duration + 10
-            )
-            
-            if result.returncode == 0:
-                data = json.loads(result.stdout)
-                summary = {
-                    'src': src,
-                    'dst': dst,
-                    'duration': duration,
-                    'bandwidth_requested': bandwidth,
-                    'bytes_transferred': data['end']['sum_sent']['bytes'],
-                    'bits_per_second': data['end']['sum_sent']['bits_per_second'],
-                    'retransmits': data['end']['sum_sent'].get('retransmits', 0),
-                    'timestamp': datetime.now().isoformat()
-                }
-                self.results.append(summary)
-                return summary
-            else:
-                self._log(f"iperf3 failed: {result.stderr}")
-                return {'error': result.stderr}
-                
-        except subprocess.TimeoutExpired:
-            self._log(f"iperf3 timeout from {src} to {dst}")
-            return {'error': 'timeout'}
-        except json.JSONDecodeError as e:
-            self._log(f"Failed to parse iperf3 output: {e}")
-            return {'error': 'parse_error'}
+            for src, dst, port in flows:
+                spawned.append(
+                    self._spawn_iperf_client(src, dst, port, duration, bandwidth, protocol)
+                )
+        except Exception:
+            # Don't leave the clients already started running or their reports open
+            for proc, fd, report_path in spawned:
+                proc.kill()
+                proc.communicate()
+                os.close(fd)
+                os.unlink(report_path)
+            raise
+        
+        # One waiter per client so no stderr pipe fills up while another is drained
+        procs, fds, paths = zip(*spawned)
+        srcs, dsts, _ = zip(*flows)
+        with ThreadPoolExecutor(max_workers=len(procs)) as ex:
+            results = list(ex.map(
+                self._collect_iperf_result, procs, fds, paths, srcs, dsts,
+                repeat(duration), repeat(bandwidth)
+            ))
+        
+        # Recorded here rather than in the workers so rows stay aligned
+        # across columns and follow the order of flows
+        for result in results:
+            self._record(result)
+        return results
     
     def incast_pattern(self, senders: List[str], receiver: str,
                       duration: int = 10, bandwidth: str = '10M') -> List[Dict]:
@@ -121,17 +478,12 @@ class TrafficGenerator:
         """
         self._log(f"=== Starting incast: {len(senders)} → 1 ===")
         
-        # Start server on receiver
-        self.start_iperf_server(receiver)
-        time.sleep(2)
+        # Start one server per sender on the receiver
+        flows = [(sender, receiver, BASE_PORT + i) for i, sender in enumerate(senders)]
+        self.start_iperf_servers(((dst, port) for _, dst, port in flows), settle=2)
         
         # Start all senders simultaneously
-        results = []
-        for sender in senders:
-            result = self.run_iperf_client(
-                sender, receiver, duration=duration, bandwidth=bandwidth
-            )
-            results.append(result)
+        results = self.run_iperf_clients(flows, duration=duration, bandwidth=bandwidth)
         
         self._log(f"=== Incast complete ===")
         return results
@@ -152,22 +504,18 @@ class TrafficGenerator:
         """
         self._log(f"=== Starting stride pattern (stride={stride}) ===")
         
-        results = []
         n = len(hosts)
+        flows = []
         
         for i, src in enumerate(hosts):
             dst_idx = (i + stride) % n
-            dst = hosts[dst_idx]
-            
-            # Start server on destination
-            self.start_iperf_server(dst)
-            time.sleep(1)
-            
-            # Run client
-            result = self.run_iperf_client(
-                src, dst, duration=duration, bandwidth=bandwidth
-            )
-            results.append(result)
+            flows.append((src, hosts[dst_idx], BASE_PORT + i))
+        
+        # Start servers on all destinations, then wait once
+        self.start_iperf_servers((dst, port) for _, dst, port in flows)
+        
+        # Run clients
+        results = self.run_iperf_clients(flows, duration=duration, bandwidth=bandwidth)
         
         self._log(f"=== Stride pattern complete ===")
         return results
@@ -186,21 +534,21 @@ class TrafficGenerator:
         Returns:
             List of results
         """
-        import random
-        
         self._log(f"=== Starting random pattern ({num_flows} flows) ===")
         
-        results = []
-        for _ in range(num_flows):
-            src, dst = random.sample(hosts, 2)
-            
-            self.start_iperf_server(dst)
-            time.sleep(1)
-            
-            result = self.run_iperf_client(
-                src, dst, duration=duration, bandwidth=bandwidth
-            )
-            results.append(result)
+        n = len(hosts)
+        randrange = self._rng.randrange
+        flows = []
+        for i in range(num_flows):
+            # Distinct (src, dst) pair from two draws, skipping over src
+            src_idx = randrange(n)
+            dst_idx = randrange(n - 1)
+            dst_idx += dst_idx >= src_idx
+            flows.append((hosts[src_idx], hosts[dst_idx], BASE_PORT + i))
+        
+        self.start_iperf_servers((dst, port) for _, dst, port in flows)
+        
+        results = self.run_iperf_clients(flows, duration=duration, bandwidth=bandwidth)
         
         self._log(f"=== Random pattern complete ===")
         return results
@@ -208,11 +556,64 @@ class TrafficGenerator:
     def save_results(self, filename: str):
         """Save all results to JSON file"""
         filepath = os.path.join(self.log_dir, filename)
-        with open(filepath, 'w') as f:
-            json.dump(self.results, f, indent=2)
+        write_json(filepath, self.results)
         self._log(f"Results saved to {filepath}")
 
 
+class JsonlCheckpoint:
+    """
+    Append-only JSONL checkpoint for one test run
+    
+    Each record is written and flushed as it is produced, so a crash
+    mid-test keeps everything recorded so far without re-serializing the
+    accumulated results. The file is opened on the first write; use the
+    checkpoint as a context manager so it is closed even if the run fails.
+    """
+    
+    __slots__ = ('path', '_fh')
+    
+    def __init__(self, test_type: str, run_id: str, results_dir: str = '../results'):
+        self.path = os.path.join(results_dir, f"{test_type}_checkpoint_{run_id}.jsonl")
+        self._fh = None
+    
+    def write(self, record: Dict):
+        """Append one record and flush it"""
+        if self._fh is None:
+            self._fh = open(self.path, 'ab')
+        self._fh.write(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+        self._fh.flush()
+    
+    def close(self):
+        """Close the checkpoint file if it was opened"""
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Process-wide generator whose servers and log are shared by the tests
+_shared_generator = None
+
+
+def new_shared_generator() -> TrafficGenerator:
+    """
+    Return a generator for one test, backed by the process-wide servers
+    
+    Tests run back to back in one process reuse the same running servers
+    and open log instead of each rebuilding them, while each test gets its
+    own result store.
+    """
+    global _shared_generator
+    if _shared_generator is None:
+        _shared_generator = TrafficGenerator()
+    return _shared_generator.share()
+
+
 if __name__ == '__main__':
     # Example usage
     gen = TrafficGenerator()
@@ -1,41 +1,66 @@
 #!/usr/bin/env python3
 """
 Leaf-spine topology for P4 experiments
-2 spines, 3 leaves, 24 hosts per leaf
+2 spines, 3 leaves, 24 hosts per leaf by default
 """
 
+import argparse
 from mininet.net import Mininet
 from mininet.topo import Topo
+from mininet.link import TCLink
 from mininet.log import setLogLevel
 from mininet.cli import CLI
 
 class LeafSpineTopo(Topo):
-    def __init__(self):
-        Topo.__init__(self)
+    def __init__(self, num_spines: int = 2, num_leaves: int = 3,
+                 hosts_per_leaf: int = 24, link_opts: dict = None):
+        # Shared link settings are given once as the topology's default
+        # lopts, which addLink() falls back to, not repeated on every call
+        Topo.__init__(self, lopts=link_opts or {})
+        
+        # Precompute every node name up front
+        spine_names = [f's{i}' for i in range(1, num_spines + 1)]
+        leaf_names = [f'l{i}' for i in range(1, num_leaves + 1)]
+        host_names = [[f'h{i}_{j}' for j in range(1, hosts_per_leaf + 1)]
+                      for i in range(1, num_leaves + 1)]
         
         # Create spines
-        spines = []
-        for i in range(1, 3):
-            spine = self.addSwitch(f's{i}')
-            spines.append(spine)
+        spines = [self.addSwitch(name) for name in spine_names]
         
         # Create leaves and hosts
-        for i in range(1, 4):
-            leaf = self.addSwitch(f'l{i}')
+        for leaf_name, leaf_hosts in zip(leaf_names, host_names):
+            leaf = self.addSwitch(leaf_name)
             
             # Connect leaf to all spines
             for spine in spines:
                 self.addLink(leaf, spine)
             
             # Add hosts to leaf
-            for j in range(1, 25):
-                host = self.addHost(f'h{i}_{j}')
-                self.addLink(host, leaf)
+            for host_name in leaf_hosts:
+                self.addLink(self.addHost(host_name), leaf)
 
 def main():
+    parser = argparse.ArgumentParser(description='Leaf-spine topology')
+    parser.add_argument('--spines', type=int, default=2, help='Number of spines')
+    parser.add_argument('--leaves', type=int, default=3, help='Number of leaves')
+    parser.add_argument('--hosts-per-leaf', type=int, default=24,
+                       help='Hosts attached to each leaf')
+    parser.add_argument('--bw', type=float, help='Link bandwidth in Mbps (uses TCLink)')
+    parser.add_argument('--delay', help="Link delay, e.g. '1ms' (uses TCLink)")
+    args = parser.parse_args()
+    
+    link_opts = {}
+    if args.bw is not None:
+        link_opts['bw'] = args.bw
+    if args.delay:
+        link_opts['delay'] = args.delay
+    
     setLogLevel('info')
-    topo = LeafSpineTopo()
-    net = Mininet(topo=topo)
+    topo = LeafSpineTopo(args.spines, args.leaves, args.hosts_per_leaf, link_opts)
+    if link_opts:
+        net = Mininet(topo=topo, link=TCLink)
+    else:
+        net = Mininet(topo=topo)
     net.start()
     CLI(net)
     net.stop()